@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# Benchmarks for the hw1 text processing: clean, splitToSentences, tokenize and the whole Ynet pipeline.
+# Run from the repository root: python -m hw1.benchmark [--quick] [--json results.json] [--html saved pages...]
+#
+# Every benchmark runs on inputs of growing size, both synthetic and from the Hebrew text under hw2/datasets,
+# and reports ops/sec, ns per char and peak memory. For every series we also report the scaling exponent:
+# the slope of log(time) over log(size), which is ~1 for linear code and ~2 for accidentally quadratic code.
+# With --max-exponent, the run fails if a series scales worse than that.
+
+import argparse
+import codecs
+import json
+import math
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from io import StringIO
+
+from lxml import etree
+from lxml import html
+
+from hw1 import compiled
+from hw1 import nlp2
+from hw1 import nlp3
+from hw1.nlp1 import clean, ynetTextFromHtml, ynetTextFromChunks
+
+########################################################################################################
+############################## Inputs ##################################################################
+########################################################################################################
+
+# A paragraph covering the interesting cases of the splitter: terminal sequences, numbers, times, quotes and
+# abbreviations, both in english and in hebrew.
+sampleParagraph = 'Hello world! How are you doing today?? I\'m Ilan, and my birthday is at 06.01.1997. ' \
+                  'He said: "The time is 13:30". I answered: "Are you sure?". ' \
+                  'הוא אמר: "ק"מ זה חשוב". "מסכים." הוצגו "מעגלי ההשפעה" של העבודות... '
+
+
+# A single paragraph of (at least) @size characters, built by repeating the sample paragraph.
+def makeParagraph(size):
+    repeats = size // len(sampleParagraph) + 1
+    return (sampleParagraph * repeats)[:size]
+
+
+# A paragraph as it comes out of the html, before @clean: with newlines, tabs and repeating spaces.
+def makeDirtyParagraph(size):
+    return makeParagraph(size).replace('. ', '.\n\t  ').replace(', ', ',\xa0 ')[:size]
+
+
+def hebrewParagraphs():
+    paragraphs = []
+    for file in ('wikipedia.txt', 'childes.txt'):
+        path = os.path.join(os.path.dirname(__file__), '..', 'hw2', 'datasets', 'devset', file)
+        with codecs.open(path, 'r', 'utf-8') as f:
+            paragraphs.extend(line.strip() for line in f if len(line.strip()) > 0)
+    return paragraphs
+
+
+# (At least) @size characters of real Hebrew text, as one paragraph.
+def hebrewParagraph(size):
+    text = " ".join(hebrewParagraphs())
+    repeats = size // len(text) + 1
+    return (" ".join([text] * repeats))[:size]
+
+
+# Sentences of real Hebrew text, with (at least) @size characters in total.
+def hebrewSentences(size):
+    sentences = []
+    chars = 0
+    while chars < size:
+        for sentence in nlp2.toSentences(hebrewParagraphs()):
+            sentences.append(sentence)
+            chars += len(sentence)
+            if chars >= size:
+                break
+    return sentences
+
+
+# A Ynet-like article page with @paragraphs paragraphs, and some menus around the article.
+def makeYnetPage(paragraphs):
+    menu = '<div class="menu"><ul>' + '<li><a href="/x">קישור</a></li>' * 50 + '</ul></div>'
+    body = ''.join('<p>%s<br>%s</p>\n' % (sampleParagraph, sampleParagraph) for _ in range(paragraphs))
+    return '<html><head><title>ynet</title></head><body>' + menu + \
+           '<h1 class="art_header_title">כותרת</h1><div class="art_header_sub_title">כותרת משנה</div>' + \
+           '<div class="art_body"><span>' + body + '</span></div>' + menu + '</body></html>'
+
+
+def readHtml(file):
+    with codecs.open(file, 'r', 'utf-8') as f:
+        return f.read()
+
+
+########################################################################################################
+############################## The measured functions ##################################################
+########################################################################################################
+
+# The extraction as it was before parsing once: parse, pretty print, and parse again.
+def roundTripYnetText(htmlStr):
+    htmlTree = etree.parse(StringIO(htmlStr), etree.HTMLParser())
+    htmlStr2 = etree.tostring(htmlTree, pretty_print=True, encoding='UTF-8').decode("UTF-8")
+    htmlTree = html.document_fromstring(htmlStr2)
+    title = htmlTree.find_class('art_header_title')[0].text
+    subtitle = htmlTree.find_class('art_header_sub_title')[0].text
+    paragraphsRaw = htmlTree.find_class('art_body')[0].xpath("//span/p")
+    paragraphs = [clean(p.text_content()) for p in paragraphsRaw]
+    return [title, subtitle] + [p for p in paragraphs if len(p) > 0]
+
+
+def chunkedYnetText(htmlStr, chunkSize=1 << 16):
+    return ynetTextFromChunks(htmlStr[i:i + chunkSize] for i in range(0, len(htmlStr), chunkSize))
+
+
+htmlExtractors = {
+    'round trip': roundTripYnetText,
+    'single parse': ynetTextFromHtml,
+    'incremental': chunkedYnetText,
+}
+
+splitters = {
+    'rules': nlp2.splitToSentences,
+    'compiled': compiled.splitToSentences,
+}
+
+tokenizers = {
+    'rules': nlp3.tokenize,
+    'compiled': compiled.tokenize,
+}
+
+
+def tokenizeSentences(tokenize):
+    return lambda sentences: [tokenize(sentence) for sentence in sentences]
+
+
+# The whole hw1 flow on an html page: extract, split and tokenize.
+def pipeline(engineName):
+    toSentences, tokenize = compiled.engine(engineName)
+    return lambda page: [tokenize(sentence) for sentence in toSentences(ynetTextFromHtml(page))]
+
+
+########################################################################################################
+############################## Measuring ###############################################################
+########################################################################################################
+
+# Run f(input) @repeat times, and return the best time in seconds.
+def bestTime(f, input, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f(input)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+# The peak of the python allocations while running f(input), in bytes.
+def pythonPeakMemory(f, input):
+    tracemalloc.start()
+    try:
+        f(input)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def currentRss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+# Runs in a fresh process: the peak memory (in bytes) of extracting the text of the page, above what the page
+# itself takes. (lxml allocates outside of python, so we measure the whole process, not with tracemalloc)
+def extractionPeakMemory(name, page):
+    before = currentRss()
+    htmlExtractors[name](page)
+    return max(0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - before)
+
+
+# A measurement, as a row of the json report.
+# ops: the number of operations in one call (paragraphs, sentences, pages), chars: the size of the input.
+def measure(benchmark, inputName, engine, f, input, ops, chars, peakBytes=None):
+    repeat = 3 if chars <= 1000000 else 1
+    seconds = max(bestTime(f, input, repeat), 1e-9)
+    if peakBytes is None:
+        peakBytes = pythonPeakMemory(f, input)
+    return {'benchmark': benchmark, 'input': inputName, 'engine': engine, 'chars': chars, 'ops': ops,
+            'seconds': seconds, 'opsPerSec': ops / seconds, 'nsPerChar': seconds * 1e9 / chars,
+            'peakBytes': peakBytes}
+
+
+########################################################################################################
+############################## The benchmarks ##########################################################
+########################################################################################################
+
+def benchmarkClean(sizes):
+    return [measure('clean', 'synthetic', None, clean, makeDirtyParagraph(size), 1, size) for size in sizes]
+
+
+def benchmarkSentences(sizes):
+    results = []
+    for inputName, makeInput in (('synthetic', makeParagraph), ('hebrew', hebrewParagraph)):
+        for size in sizes:
+            paragraph = makeInput(size)
+            for engine, splitter in splitters.items():
+                results.append(measure('splitToSentences', inputName, engine, splitter, paragraph, 1, size))
+    return results
+
+
+def benchmarkTokenize(sizes):
+    results = []
+    for size in sizes:
+        sentences = hebrewSentences(size)
+        chars = sum(map(len, sentences))
+        for engine, tokenize in tokenizers.items():
+            results.append(measure('tokenize', 'hebrew', engine, tokenizeSentences(tokenize), sentences,
+                                   len(sentences), chars))
+    return results
+
+
+def benchmarkPipeline(paragraphCounts, htmlFiles=()):
+    pages = [('synthetic', makeYnetPage(count)) for count in paragraphCounts] + \
+            [(os.path.basename(file), readHtml(file)) for file in htmlFiles]
+    results = []
+    pool = multiprocessing.get_context('spawn').Pool(1, maxtasksperchild=1)
+    for inputName, page in pages:
+        for name, extractor in htmlExtractors.items():
+            peak = pool.apply(extractionPeakMemory, (name, page))
+            results.append(measure('ynetText', inputName, name, extractor, page, 1, len(page), peak))
+        for engine in splitters:
+            results.append(measure('pipeline', inputName, engine, pipeline(engine), page, 1, len(page)))
+    pool.close()
+    return results
+
+
+########################################################################################################
+############################## Reporting ###############################################################
+########################################################################################################
+
+# The slope of log(seconds) over log(chars) in every series of growing inputs.
+# It's taken between the two largest inputs, as the small ones are dominated by constant costs and noise.
+def scalingExponents(results):
+    series = {}
+    for result in results:
+        if result['input'] in ('synthetic', 'hebrew'):
+            key = (result['benchmark'], result['input'], result['engine'])
+            series.setdefault(key, []).append(result)
+    exponents = []
+    for (benchmark, inputName, engine), rows in series.items():
+        rows = sorted(rows, key=lambda row: row['chars'])
+        if len(rows) >= 2 and rows[-1]['chars'] > rows[-2]['chars']:
+            first, last = rows[-2], rows[-1]
+            exponent = math.log(last['seconds'] / first['seconds']) / math.log(last['chars'] / first['chars'])
+            exponents.append({'benchmark': benchmark, 'input': inputName, 'engine': engine, 'exponent': exponent})
+    return exponents
+
+
+def printTable(results, exponents):
+    print("%-18s %-14s %-13s %10s %12s %12s %10s %10s" %
+          ("benchmark", "input", "engine", "chars", "ops/sec", "ns/char", "peak KB", "seconds"))
+    for result in results:
+        print("%-18s %-14s %-13s %10d %12.1f %12.1f %10d %10.4f" %
+              (result['benchmark'], result['input'][:14], result['engine'] or '-', result['chars'],
+               result['opsPerSec'], result['nsPerChar'], result['peakBytes'] // 1024, result['seconds']))
+    print()
+    print("scaling exponents (1 = linear):")
+    for exponent in exponents:
+        print("%-18s %-14s %-13s %6.2f" %
+              (exponent['benchmark'], exponent['input'], exponent['engine'] or '-', exponent['exponent']))
+
+
+def runAll(quick=False, htmlFiles=()):
+    sizes = (1000, 10000, 100000) if quick else (1000, 10000, 100000, 1000000)
+    results = benchmarkClean(sizes) + \
+              benchmarkSentences(sizes if quick else sizes + (10000000,)) + \
+              benchmarkTokenize(sizes) + \
+              benchmarkPipeline((100, 1000) if quick else (100, 1000, 10000), htmlFiles)
+    return results, scalingExponents(results)
+
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description='Benchmark the hw1 text processing.')
+    argParser.add_argument('--quick', action='store_true', help='smaller inputs')
+    argParser.add_argument('--json', help='write the results to this file')
+    argParser.add_argument('--html', nargs='*', default=[], help='saved Ynet pages to run the pipeline on')
+    argParser.add_argument('--max-exponent', type=float, default=None,
+                           help='fail if a benchmark scales worse than size ** max-exponent')
+    args = argParser.parse_args()
+
+    results, exponents = runAll(args.quick, args.html)
+    printTable(results, exponents)
+    if args.json:
+        with codecs.open(args.json, 'w', 'utf-8') as f:
+            json.dump({'python': sys.version, 'results': results, 'scaling': exponents}, f, indent=2)
+
+    if args.max_exponent is not None:
+        worse = [exponent for exponent in exponents if exponent['exponent'] > args.max_exponent]
+        for exponent in worse:
+            print("%s (%s, %s) scales with exponent %.2f" %
+                  (exponent['benchmark'], exponent['input'], exponent['engine'], exponent['exponent']),
+                  file=sys.stderr)
+        sys.exit(1 if len(worse) > 0 else 0)
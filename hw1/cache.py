@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# An on-disk cache of downloaded articles, so re-running the pipeline doesn't download and parse them again.
+# Each article is stored under the sha256 of its url:
+#   <hash>.html - the raw html.
+#   <hash>.json - the url, the ETag & Last-Modified headers (to revalidate it), and the cleaned paragraphs.
+# The cache is bounded in size, and the least recently used articles are evicted first.
+
+import codecs
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def urlKey(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+# Write to a temporary file and rename it, so a crashed run never leaves a half written entry.
+# Every write has its own temporary file, as two threads may put the same url at once.
+def writeAtomically(path, data):
+    fd, temp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path) or '.')
+    try:
+        with open(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+class ArticleCache:
+    # folder: String
+    # maxBytes: Int
+    # entries: OrderedDict[key, size in bytes], from the least to the most recently used.
+
+    def __init__(self, folder, maxBytes=1 << 30):
+        self.folder = folder
+        self.maxBytes = maxBytes
+        self.lock = threading.Lock()
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self.entries = OrderedDict()
+        self.totalBytes = 0
+        self.loadIndex()
+
+    # Rebuild the LRU order of a previous run from the modification times, which we update on every access.
+    # put writes the .html first, so an .html without its .json is of a crashed put, and is removed.
+    def loadIndex(self):
+        found = []
+        for file in os.listdir(self.folder):
+            if file.endswith('.html') and not os.path.exists(self.paths(file[:-len('.html')])[0]):
+                os.remove(os.path.join(self.folder, file))
+            elif file.endswith('.json'):
+                key = file[:-len('.json')]
+                metaPath, htmlPath = self.paths(key)
+                if not os.path.exists(htmlPath):
+                    os.remove(metaPath)
+                    continue
+                size = os.path.getsize(metaPath) + os.path.getsize(htmlPath)
+                found.append((os.path.getmtime(metaPath), key, size))
+            elif file.endswith('.tmp'):
+                os.remove(os.path.join(self.folder, file))
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.totalBytes += size
+
+    def paths(self, key):
+        return os.path.join(self.folder, key + '.json'), os.path.join(self.folder, key + '.html')
+
+    # get: url -> IO {url, etag, lastModified, paragraphs} or None
+    def get(self, url):
+        key = urlKey(url)
+        metaPath, _ = self.paths(key)
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+        # outside of the lock, so another thread may evict the article meanwhile, which is a miss.
+        try:
+            os.utime(metaPath)
+            with codecs.open(metaPath, 'r', 'utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    # html: url -> IO String or None
+    def html(self, url):
+        _, htmlPath = self.paths(urlKey(url))
+        try:
+            with codecs.open(htmlPath, 'r', 'utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url, htmlStr, paragraphs, etag=None, lastModified=None):
+        key = urlKey(url)
+        metaPath, htmlPath = self.paths(key)
+        meta = json.dumps({'url': url, 'etag': etag, 'lastModified': lastModified, 'paragraphs': paragraphs},
+                          ensure_ascii=False)
+        writeAtomically(htmlPath, htmlStr)
+        writeAtomically(metaPath, meta)
+        size = os.path.getsize(metaPath) + os.path.getsize(htmlPath)
+        with self.lock:
+            self.totalBytes += size - self.entries.pop(key, 0)
+            self.entries[key] = size
+            self.evict()
+
+    # Remove the least recently used articles until we fit in @maxBytes. (the lock is held by the caller)
+    def evict(self):
+        while self.totalBytes > self.maxBytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.totalBytes -= size
+            for path in self.paths(key):
+                if os.path.exists(path):
+                    os.remove(path)
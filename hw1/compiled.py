@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# The boundary rules of @isEndOfSentence and @isNewToken, compiled into regular expressions,
+# so the scanning over the characters happens inside the regex engine (in C), and not in a python loop.
+#
+# The engine is selectable at runtime: engine(name) returns the (toSentences, tokenize) pair of either
+# the 'rules' engine (nlp2 & nlp3) or the 'compiled' one, and the default comes from the HW1_ENGINE env var.
+
+import os
+import re
+import sys
+from functools import lru_cache
+
+from hw1 import nlp2
+from hw1 import nlp3
+from hw1.nlp2 import isEndOfSentence, isQuotationQuote, isTerminalChar
+
+########################################################################################################
+############################## Character classes #######################################################
+########################################################################################################
+
+# The regex classes \d and \w aren't exactly str.isdigit and str.isalnum (e.g. '²' is a digit but not \d),
+# so we build the classes from the predicates themselves, as ranges of code points.
+def charClass(predicate, negate=False):
+    ranges = []
+    start = None
+    for code in range(sys.maxunicode + 2):
+        if code <= sys.maxunicode and predicate(chr(code)):
+            if start is None:
+                start = code
+        elif start is not None:
+            ranges.append((start, code - 1))
+            start = None
+    body = ''.join('\\U%08x' % first if first == last else '\\U%08x-\\U%08x' % (first, last)
+                   for first, last in ranges)
+    return '[' + ('^' if negate else '') + body + ']'
+
+
+def literalClass(chars, negate=False):
+    return '[' + ('^' if negate else '') + ''.join('\\U%08x' % ord(c) for c in sorted(chars)) + ']'
+
+
+########################################################################################################
+############################## Tokens ##################################################################
+########################################################################################################
+
+# A token is the shortest run of characters after which @isNewToken splits.
+# SPLIT is the disjunction of the rules of @isNewToken at a position between @prev and @next,
+# with lookbehinds for prevPrev & prev, and lookaheads for next & nextNext.
+# Inside a token the window looks back only into the token itself, except for its first char:
+# a token that starts with '"' is always just '"', which is the alternative before the general one.
+@lru_cache(maxsize=None)
+def tokenRegex():
+    A = charClass(str.isalnum)
+    D = charClass(str.isdigit)
+    always = literalClass(nlp3.alwaysTokenChars)
+    plain = literalClass(nlp3.specialChars, negate=True)
+    split = '|'.join([
+        # if the last or next char is always a token, split. (the end of the string counts as a space)
+        '(?<=' + always + ')', '(?=' + always + ')', r'\Z',
+        # '"' or '-' not surrounded by letters
+        '(?<!' + A + ')(?=["-])', '(?=["-](?!' + A + '))',
+        # the '"' before us is not surrounded by letters
+        '(?<=")(?<!' + A + '")', '(?<=")(?!' + A + ')',
+        # ':' not inside a time
+        '(?<!' + D + ')(?=:)', '(?=:(?!' + D + '))',
+        # '.' not inside a number, and not after another '.'
+        r'(?<!\.)(?<!' + D + r')(?=\.)', r'(?<!\.)(?=\.(?!' + D + '))',
+        # '*' not before a phone number
+        r'(?=\*(?!' + D + '))',
+    ])
+    # Between two plain chars no rule can split, so they're skipped without checking SPLIT.
+    # The most common token, a plain word before a space, is tried first.
+    token = plain + '+(?=' + always + r'|\Z)|"|(?:' + plain + '+(?=' + plain + ')|.(?!' + split + '))*.'
+    return re.compile(r'\s*(' + token + ')', re.DOTALL)
+
+
+# Same as nlp3.tokenSpans
+def tokenSpans(s):
+    for match in tokenRegex().finditer(s, 0, len(s.rstrip())):
+        yield match.span(1)
+
+
+# Same as nlp3.tokenize
+def tokenize(s):
+    return tokenRegex().findall(s, 0, len(s.rstrip()))
+
+
+def tokenizeAllSentences(sentences):
+    return map((lambda sentence: " ".join(tokenize(sentence))), sentences)
+
+
+########################################################################################################
+############################## Sentences ###############################################################
+########################################################################################################
+
+# @isEndOfSentence can only be true when the current char is terminal or a ',' (after a quote),
+# and @isQuotationQuote only when it's a '"'. Every other window just moves on,
+# so the regex jumps straight to the next window that may do something.
+candidateChar = re.compile('[' + re.escape('?!.;:,"') + ']')
+
+
+# The (start, end) offsets of the sentences of nlp2.splitToSentences:
+# the same windows, in the same order, but only the candidate ones.
+def sentenceSpans(paragraph):
+    n = len(paragraph)
+    start = 0
+
+    if n == 1 and isTerminalChar(paragraph[0]):
+        yield 0, 1
+        start = 1
+    elif n > 1 and isEndOfSentence(False, "", paragraph[0], paragraph[1]):
+        yield 0, 1
+        start = 1
+
+    inQuotes = start < n and paragraph[start] == '"'
+
+    # The window (before, current, after) = paragraph[c-1:c+2], for every c from start + 1 to n - 2.
+    # After an end of sentence, the next window starts at the new sentence, so we skip one more char.
+    pos = start + 1
+    while True:
+        match = candidateChar.search(paragraph, pos, n - 1)
+        if match is None:
+            break
+        c = match.start()
+        before = paragraph[c - 1]
+        current = paragraph[c]
+        after = paragraph[c + 1]
+        if isEndOfSentence(inQuotes, before, current, after):
+            yield start, c + 1
+            start = c + 1
+            pos = c + 2
+        else:
+            pos = c + 1
+
+        if isQuotationQuote(before, current, after):
+            inQuotes = not inQuotes
+    if start < n:
+        yield start, n
+
+
+# Same as nlp2.splitToSentences
+def splitToSentences(paragraph):
+    return [paragraph[start:end] for start, end in sentenceSpans(paragraph)]
+
+
+def toSentences(paragraphs):
+    for p in paragraphs:
+        for sentence in splitToSentences(p):
+            yield sentence.strip()
+
+
+########################################################################################################
+############################## Selecting the engine ####################################################
+########################################################################################################
+
+engines = {
+    'rules': (nlp2.toSentences, nlp3.tokenize),
+    'compiled': (toSentences, tokenize),
+}
+
+
+# engine: name -> (toSentences, tokenize)
+def engine(name=None):
+    return engines[name or os.environ.get('HW1_ENGINE', 'rules')]
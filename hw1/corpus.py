@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Split & tokenize a whole directory of documents, on all the cores.
+# Run from the repository root: python -m hw1.corpus <input folder> <output folder> [--processes N] [--engine E]
+# Each document is a text file with a paragraph on each line, and for each document <name>.txt we write
+# <name>_sentences.txt and <name>_tokenized.txt, like hw1.py does for a single article.
+
+import argparse
+import codecs
+import os
+import time
+from multiprocessing import Pool, cpu_count
+
+from hw1.compiled import engine, engines
+from hw1.nlp1 import readTextParagraphs
+
+
+def outputName(file):
+    return os.path.splitext(os.path.basename(file))[0]
+
+
+# Runs in a worker: split & tokenize one document, writing both files as the sentences flow.
+# processDocument: (input file, output folder, engine name) -> IO (worker pid, #sentences, #chars, seconds)
+def processDocument(job):
+    file, outputFolder, engineName = job
+    toSentences, tokenize = engine(engineName)
+    start = time.perf_counter()
+    name = outputName(file)
+    sentencesCount = 0
+    chars = 0
+    with codecs.open(os.path.join(outputFolder, name + '_sentences.txt'), 'w', 'utf-8') as sentencesFile, \
+            codecs.open(os.path.join(outputFolder, name + '_tokenized.txt'), 'w', 'utf-8') as tokenizedFile:
+        for sentence in toSentences(readTextParagraphs(file)):
+            sentencesFile.write(sentence + '\r\n')
+            tokenizedFile.write(" ".join(tokenize(sentence)) + '\r\n')
+            sentencesCount += 1
+            chars += len(sentence)
+    return os.getpid(), sentencesCount, chars, time.perf_counter() - start
+
+
+# tokenizeCorpus: input folder, output folder -> IO Map[worker pid, (#documents, #sentences, #chars, seconds)]
+# The documents are handed to the workers in the (sorted) order of the folder,
+# a few at a time, so a large document doesn't hold back a whole shard.
+# Documents whose names differ only in the extension (a.txt & a.md) would write the same output files,
+# so they're rejected before anything is written.
+def tokenizeCorpus(inputFolder, outputFolder, processes=None, engineName=None):
+    files = [os.path.join(inputFolder, file) for file in sorted(os.listdir(inputFolder))
+             if os.path.isfile(os.path.join(inputFolder, file))]
+    byName = {}
+    for file in files:
+        byName.setdefault(outputName(file), []).append(os.path.basename(file))
+    clashes = [names for names in byName.values() if len(names) > 1]
+    if len(clashes) > 0:
+        raise ValueError("documents with the same output files: %s" % "; ".join(map(", ".join, clashes)))
+    if not os.path.exists(outputFolder):
+        os.makedirs(outputFolder)
+    processes = processes or cpu_count()
+    chunkSize = max(1, len(files) // (processes * 8))
+
+    jobs = [(file, outputFolder, engineName) for file in files]
+    workers = {}
+    with Pool(processes) as pool:
+        for pid, sentences, chars, seconds in pool.imap(processDocument, jobs, chunkSize):
+            documents, totalSentences, totalChars, totalSeconds = workers.get(pid, (0, 0, 0, 0.0))
+            workers[pid] = (documents + 1, totalSentences + sentences, totalChars + chars, totalSeconds + seconds)
+    return workers
+
+
+def printThroughput(workers, elapsed):
+    print("%10s %10s %12s %14s %14s" % ("worker", "documents", "sentences", "sentences/sec", "chars/sec"))
+    for pid, (documents, sentences, chars, seconds) in sorted(workers.items()):
+        seconds = max(seconds, 1e-9)
+        print("%10d %10d %12d %14.0f %14.0f" % (pid, documents, sentences, sentences / seconds, chars / seconds))
+    sentences = sum(worker[1] for worker in workers.values())
+    chars = sum(worker[2] for worker in workers.values())
+    print("total: %d sentences in %.1f seconds, %.0f sentences/sec, %.0f chars/sec" %
+          (sentences, elapsed, sentences / max(elapsed, 1e-9), chars / max(elapsed, 1e-9)))
+
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description='Split & tokenize a folder of documents in parallel.')
+    argParser.add_argument('input', help='a folder of text files, with a paragraph on each line')
+    argParser.add_argument('output', help='the output folder')
+    argParser.add_argument('--processes', type=int, default=None, help='the number of workers (default: #cores)')
+    argParser.add_argument('--engine', choices=sorted(engines), default=None,
+                           help='the splitter & tokenizer engine (default: $HW1_ENGINE, or rules)')
+    args = argParser.parse_args()
+
+    start = time.perf_counter()
+    workers = tokenizeCorpus(args.input, args.output, args.processes, args.engine)
+    printThroughput(workers, time.perf_counter() - start)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# Batch mode for hw1: fetch many Ynet articles concurrently, and split & tokenize each of them.
+# Run from the repository root: python -m hw1.crawler <urls file> <output folder> [--workers N] [--refresh]
+# The urls file has a url on each line.
+# The articles are cached on disk (see hw1/cache.py), so re-running after a change in the tokenizer
+# doesn't download or parse them again, unless --refresh is given.
+
+import argparse
+import codecs
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from hw1.cache import ArticleCache
+from hw1.nlp1 import ynetTextFromHtml
+from hw1.nlp2 import toSentences
+from hw1.nlp3 import tokenizeAllSentences
+
+########################################################################################################
+############################## Fetching ################################################################
+########################################################################################################
+
+# A session shared by all the workers, keeping up to @poolSize open connections to each host.
+# Connection errors and 429/5xx responses are retried with an exponential backoff.
+def makeSession(poolSize, retries=3, backoff=0.5):
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET']))
+    adapter = HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Lets at most one request start every @delay seconds for each host, so we don't flood a single server.
+class HostRateLimiter:
+    # delay: Double (seconds)
+    # nextStart: Map[host, Double (time.monotonic)]
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.nextStart = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.nextStart.get(host, now))
+            # Reserve our slot before sleeping, so that the other threads line up after us.
+            self.nextStart[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+
+# fetchArticle: url -> IO (paragraphs or None, error or None)
+# Errors are returned instead of raised, so that one bad article doesn't stop the whole batch.
+# With a @cache, a cached article is returned without going to the network,
+# and on @refresh it's revalidated with its ETag / Last-Modified. An unchanged page isn't downloaded again,
+# but its cached html is parsed again, as the cached paragraphs may be of an older ynetTextFromHtml.
+def fetchArticle(session, limiter, url, timeout, cache=None, refresh=False):
+    try:
+        cached = cache.get(url) if cache is not None else None
+        if cached is not None and not refresh:
+            return cached['paragraphs'], None
+
+        # Without the html there's nothing to parse on a 304, so the page is downloaded again.
+        cachedHtml = cache.html(url) if cached is not None else None
+        headers = {}
+        if cachedHtml is not None and cached['etag'] is not None:
+            headers['If-None-Match'] = cached['etag']
+        if cachedHtml is not None and cached['lastModified'] is not None:
+            headers['If-Modified-Since'] = cached['lastModified']
+
+        limiter.wait(url)
+        response = session.get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and cachedHtml is not None:
+            paragraphs = ynetTextFromHtml(cachedHtml)
+            cache.put(url, cachedHtml, paragraphs, response.headers.get('ETag', cached['etag']),
+                      response.headers.get('Last-Modified', cached['lastModified']))
+            return paragraphs, None
+        response.raise_for_status()
+        paragraphs = ynetTextFromHtml(response.text)
+        if cache is not None:
+            cache.put(url, response.text, paragraphs,
+                      response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return paragraphs, None
+    except Exception as e:
+        return None, e
+
+
+# crawl: [url] -> Iterator[(url, paragraphs or None, error or None)], in the order of the urls.
+# The pages are fetched by @workers threads, with at most 4 pages per worker fetched ahead of the consumer.
+# timeout: (connect timeout, read timeout) in seconds.
+def crawl(urls, workers=16, perHostDelay=0.1, timeout=(5, 30), retries=3, backoff=0.5, cache=None, refresh=False):
+    session = makeSession(workers, retries, backoff)
+    limiter = HostRateLimiter(perHostDelay)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for url in urls:
+            pending.append((url, executor.submit(fetchArticle, session, limiter, url, timeout, cache, refresh)))
+            if len(pending) >= workers * 4:
+                url, future = pending.popleft()
+                yield (url,) + future.result()
+        while len(pending) > 0:
+            url, future = pending.popleft()
+            yield (url,) + future.result()
+    session.close()
+
+
+########################################################################################################
+############################## Input & Output ##########################################################
+########################################################################################################
+
+def readUrls(file):
+    with codecs.open(file, 'r', 'utf-8') as f:
+        for line in f:
+            url = line.strip()
+            if len(url) > 0:
+                yield url
+
+
+def writeLines(file, lines):
+    with codecs.open(file, 'w', 'utf-8') as f:
+        for line in lines:
+            f.write(line + '\r\n')
+
+
+# Write the same 3 files as hw1.py, prefixed by the index of the article in the urls file.
+def writeArticle(outputFolder, name, paragraphs):
+    sentences = list(toSentences(paragraphs))
+    writeLines(os.path.join(outputFolder, name + '_article.txt'), paragraphs)
+    writeLines(os.path.join(outputFolder, name + '_sentences.txt'), sentences)
+    writeLines(os.path.join(outputFolder, name + '_tokenized.txt'), tokenizeAllSentences(sentences))
+
+
+def crawlToFolder(urlsFile, outputFolder, workers=16, cache=None, refresh=False):
+    if not os.path.exists(outputFolder):
+        os.makedirs(outputFolder)
+
+    start = time.perf_counter()
+    fetched = 0
+    failed = 0
+    articles = crawl(readUrls(urlsFile), workers, cache=cache, refresh=refresh)
+    for index, (url, paragraphs, error) in enumerate(articles):
+        if error is not None:
+            failed += 1
+            print("failed: %s (%s)" % (url, error), file=sys.stderr)
+        else:
+            fetched += 1
+            writeArticle(outputFolder, "%06d" % index, paragraphs)
+    elapsed = time.perf_counter() - start
+    print("%d articles, %d failed, %.1f seconds (%.0f articles/hour)" %
+          (fetched, failed, elapsed, fetched * 3600 / max(elapsed, 1e-9)))
+
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description='Fetch, split and tokenize a list of Ynet articles.')
+    argParser.add_argument('urls', help='a file with a url on each line')
+    argParser.add_argument('output', help='the output folder')
+    argParser.add_argument('--workers', type=int, default=16)
+    argParser.add_argument('--cache', default='.article_cache', help='the cache folder')
+    argParser.add_argument('--cache-mb', type=int, default=1024, help='the maximal size of the cache')
+    argParser.add_argument('--refresh', action='store_true', help='revalidate the cached articles, and parse them again')
+    args = argParser.parse_args()
+
+    crawlToFolder(args.urls, args.output, args.workers, ArticleCache(args.cache, args.cache_mb << 20), args.refresh)
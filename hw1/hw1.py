@@ -6,7 +6,6 @@
 import requests
 from lxml import html
 from lxml import etree
-from io import StringIO
 import re
 import sys
 import os
@@ -21,15 +20,13 @@ import codecs
 def getYnetText(url):
     # Get the web page source html, as a string
     req = requests.get(url)
-    htmlStr = req.text
+    return ynetTextFromHtml(req.text)
 
-    # Parse the text as an XML tree, with error-correcting parsing for html.
-    htmlTree = etree.parse(StringIO(htmlStr), etree.HTMLParser())  # type: etree.ElementTree
-    # Pretty print it again to a string, now correct xml.
-    htmlStr2 = etree.tostring(htmlTree, pretty_print=True, encoding='UTF-8').decode("UTF-8")
 
-    # Parse again, but now with the convenient html api (the parsing from this api isn't error-correcting)
-    htmlTree = html.document_fromstring(htmlStr2)  # type: etree.ElementTree
+# The title, the subtitle and the paragraphs of a Ynet article, given its html source.
+def ynetTextFromHtml(htmlStr):
+    # Parse the text once, with the error-correcting html parser.
+    htmlTree = html.document_fromstring(htmlStr)  # type: etree.ElementTree
 
     # Get the title
     title = htmlTree.find_class('art_header_title')[0].text
@@ -40,7 +37,8 @@ def getYnetText(url):
     # go to span - the parent of all the paragraphs, and get the paragraphs.
     # the div contained p's that aren't sentences.
     # This returns a list of paragraphs, some containing breaks.
-    paragraphsRaw = htmlTree.find_class('art_body')[0].xpath("//span/p")
+    # The query is relative to the article body, so it only searches its subtree.
+    paragraphsRaw = htmlTree.find_class('art_body')[0].xpath(".//span/p")
 
     # Clean all the paragraphs, see the @clean function
     cleanedParagraphs = list(map((lambda x: clean(x.text_content())), paragraphsRaw))
@@ -51,12 +49,104 @@ def getYnetText(url):
     return [title, subtitle] + paragraphs
 
 
+# Same as @getYnetText, but the page is parsed while it's being downloaded. See @ynetTextFromChunks.
+def getYnetTextIncremental(url):
+    with requests.get(url, stream=True) as req:
+        return ynetTextFromChunks(req.iter_content(chunk_size=1 << 16, decode_unicode=True))
+
+
+def hasClass(element, name):
+    return name in (element.get('class') or '').split()
+
+
+# Same as @ynetTextFromHtml, but parses the html incrementally from an iterable of chunks (strings or bytes).
+# Every part of the tree we're done with is thrown away, so the memory doesn't grow with the size of the page.
+def ynetTextFromChunks(chunks):
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+
+    def events():
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+
+    titleElement = None
+    subtitleElement = None
+    bodyElement = None
+    title = None
+    subtitle = None
+    paragraphs = []
+    # The number of open elements whose subtree we still need: the first title, subtitle and article body.
+    needed = 0
+
+    for event, element in events():
+        if event == 'start':
+            # The first element of each class, like find_class(...)[0].
+            if titleElement is None and hasClass(element, 'art_header_title'):
+                titleElement = element
+                needed += 1
+            elif subtitleElement is None and hasClass(element, 'art_header_sub_title'):
+                subtitleElement = element
+                needed += 1
+            elif bodyElement is None and hasClass(element, 'art_body'):
+                bodyElement = element
+                needed += 1
+            continue
+
+        parent = element.getparent()
+        if element is titleElement:
+            title = element.text
+            needed -= 1
+        elif element is subtitleElement:
+            subtitle = element.text
+            needed -= 1
+        elif element is bodyElement:
+            needed -= 1
+        elif element.tag == 'p' and parent is not None and parent.tag == 'span' and parent is not bodyElement \
+                and isDescendant(parent, bodyElement):
+            # Same as x.text_content()
+            paragraph = clean(etree.tostring(element, method='text', encoding=str, with_tail=False))
+            if len(paragraph) > 0:
+                paragraphs.append(paragraph)
+            element.clear(keep_tail=True)
+
+        if needed == 0:
+            element.clear(keep_tail=True)
+            # Also drop the siblings we've already finished with.
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+
+    return [title, subtitle] + paragraphs
+
+
+def isDescendant(element, ancestor):
+    while element is not None:
+        if element is ancestor:
+            return True
+        element = element.getparent()
+    return False
+
+
+# Any run of newlines, tabs & spaces, except for a single space which is already clean.
+insignificantSpaces = re.compile("[ \n\xa0\t]{2,}|[\n\xa0\t]")
+
+
 def clean(p):
     # Eliminate all newlines & tabs, as they are insignificant in html.
-    noNewlines = re.sub(r"\n|\xa0|\t", " ", p)
     # Eliminate repeating spaces, as they are insignificant in html.
-    noDuplicateSpaces = re.sub(" +", " ", noNewlines)
-    return noDuplicateSpaces.strip()
+    # Both in one pass: each run of them becomes a single space.
+    return insignificantSpaces.sub(" ", p).strip()
+
+
+# Read the paragraphs of a (possibly huge) local text file, one paragraph per line, cleaned like the html ones.
+# A generator: the file is never read into memory as a whole.
+def readTextParagraphs(file):
+    with codecs.open(file, 'r', 'utf-8') as f:
+        for line in f:
+            paragraph = clean(line)
+            if len(paragraph) > 0:
+                yield paragraph
 
 
 ########################################################################################################
@@ -117,48 +207,52 @@ def splitToSentences(paragraph):
     # Also, "??" and "?!" should be considered as one.
     # Because e.g. "How many items did you buy? We bought 3. That's good."
     #   ^ The '.' here does indicate the end of a sentence.
+    # We walk over the paragraph with indices instead of rebuilding the remaining string and the prefix
+    # on every step, as that would be quadratic in the length of the paragraph.
+    # @start is the index where the current sentence begins (the prefix is paragraph[start:i]),
+    # and @i is the index of @before in the current window.
     sentences = []
-    prefix = ""
-    str = paragraph
+    n = len(paragraph)
+    start = 0
 
-    if len(str) == 1 and isTerminalChar(str[0]):
-        sentences.append(str[0])
-        str = str[1:]
-    elif len(str) > 1 and isEndOfSentence(False, "", str[0], str[1]):
-        sentences.append(str[0])
-        str = str[1:]
+    if n == 1 and isTerminalChar(paragraph[0]):
+        sentences.append(paragraph[0])
+        start = 1
+    elif n > 1 and isEndOfSentence(False, "", paragraph[0], paragraph[1]):
+        sentences.append(paragraph[0])
+        start = 1
 
-    inQuotes = False
-    if len(str) > 0:
-        inQuotes = str[0] == '"'
+    inQuotes = start < n and paragraph[start] == '"'
 
     # See pseudo-code below for explanation.
-    while len(str) > 2:
-        before = str[0]
-        current = str[1]
-        after = str[2]
-        rest = str[3:]
+    i = start
+    while n - i > 2:
+        before = paragraph[i]
+        current = paragraph[i + 1]
+        after = paragraph[i + 2]
         if isEndOfSentence(inQuotes, before, current, after):
-            sentences.append(prefix + before + current)
-            prefix = ""
-            str = after + rest
+            sentences.append(paragraph[start:i + 2])
+            # recurse on (after + rest)
+            start = i + 2
+            step = 2
         else:
-            prefix = prefix + before
-            str = current + after + rest
+            # recurse on (current + after + rest), the prefix grows by @before.
+            step = 1
 
         if isQuotationQuote(before, current, after):
             inQuotes = not inQuotes
-    if prefix + str != "":
-        sentences.append(prefix + str)
+        i += step
+    if start < n:
+        sentences.append(paragraph[start:])
     return sentences
 
 def toSentences(paragraphs):
-    res = []
+    # A generator, so that a large text flows paragraph by paragraph.
     for p in paragraphs:
         # Each paragraph produces a list of sentences.
-        res.extend(splitToSentences(p))
-    # Sentences shouldn't start with a space - an artifact of splitting right after a dot.
-    return list(map((lambda sentence: sentence.strip()), res))
+        for sentence in splitToSentences(p):
+            # Sentences shouldn't start with a space - an artifact of splitting right after a dot.
+            yield sentence.strip()
 
 ########################################################################################################
 ########################### Part 2: Splitting Unit Tests & Pseudo-Code #################################
@@ -263,20 +357,24 @@ def eatToken(s):
     if len(s) == 0:
         return None
 
-    i = 0
-    while 0 <= i < len(s) and not isNewToken(tryCharAt(s, i - 1), s[i], tryCharAt(s, i + 1), tryCharAt(s, i + 2)):
-        i += 1
-
-    return s[0:i + 1], s[i + 1:]
+    start, end = next(tokenSpans(s))
+    return s[start:end], s[end:]
 
 
 def tokenize(s):
+    # Same as the tokens of @tokenSpans, without computing offsets in the whole sentence.
     tokens = []
-    while len(s) > 0:
-        token, rest = eatToken(s)
-        if token is not None:
-            tokens.append(token)
-        s = rest
+    for word in s.rstrip().split(' '):
+        if word.isalnum():
+            tokens.append(word)
+        elif not word:
+            continue
+        elif word[-1] in specialChars and word[:-1].isalnum():
+            # A word followed by a punctuation mark, such as 'word,' or 'word.'
+            tokens.append(word[:-1])
+            tokens.append(word[-1])
+        else:
+            tokens.extend(word[start:end] for start, end in wordTokenSpans(word, 0, len(word)))
     return tokens
 
 
@@ -319,9 +417,88 @@ def alwaysToken(c):
     return c in " !?,();/\\+="
 
 
+# The tokenizer engine: walks the sentence once with a cursor and yields the (start, end) offsets of the tokens,
+# so a token is copied only if someone asks for it (see @tokenize).
+# It decides exactly like calling @eatToken repeatedly:
+#  * The whitespace before a token is skipped, and the sentence ends where its trailing whitespace starts.
+#  * Every token is examined on its own, so the window never looks before the start of the token.
+# A space is always a token, and for the other rules a space after the window is the same as the end of the string,
+#   so the words between the spaces can be tokenized independently.
+# Most of them are plain words or numbers, which are a token by themselves.
+# In the others, @isNewToken can only split around one of the special chars below,
+#   so between them we jump with a regex scan instead of examining every window.
+alwaysTokenChars = frozenset(" !?,();/\\+=")
+specialChars = alwaysTokenChars | frozenset('"-:.*')
+nextSpecialChar = re.compile('[' + re.escape(''.join(sorted(specialChars))) + ']')
+
+
+def tokenSpans(s):
+    end = len(s.rstrip())
+    pos = 0
+    for word in s[:end].split(' '):
+        wordEnd = pos + len(word)
+        if word.isalnum():
+            yield pos, wordEnd
+        elif word:
+            yield from wordTokenSpans(s, pos, wordEnd)
+        pos = wordEnd + 1
+
+
+# The token offsets in s[pos:end], which has no spaces.
+def wordTokenSpans(s, pos, end):
+    while True:
+        # Throw away spaces in the beginning (after we've eaten a word)
+        while pos < end and s[pos].isspace():
+            pos += 1
+        if pos >= end:
+            return
+
+        start = pos
+        i = start
+        # Find the first window (prev = s[i]) after which we split.
+        while i + 1 < end:
+            prev = s[i]
+            next = s[i + 1]
+            if prev not in specialChars and next not in specialChars:
+                # No rule can split here, jump to the window just before the next special char.
+                match = nextSpecialChar.search(s, i + 2, end)
+                if match is None:
+                    i = end - 1
+                    break
+                i = match.start() - 1
+                continue
+            if prev in alwaysTokenChars or next in alwaysTokenChars:
+                break
+            prevPrev = s[i - 1] if i > start else ""
+            nextNext = s[i + 2] if i + 2 < end else ""
+            if isNewTokenAt(prevPrev, prev, next, nextNext):
+                break
+            i += 1
+        # Here either we split after s[i], or s[i] is the last char. (then next = "", which is always a token)
+        pos = i + 1
+        yield start, pos
+
+
+# Same as @isNewToken, for a window with 4 actual chars around a special char,
+# when neither @prev nor @next is always a token.
+def isNewTokenAt(prevPrev, prev, next, nextNext):
+    if (next == '"' or next == '-') and not (prev.isalnum() and nextNext.isalnum()):
+        return True
+    elif prev == '"' and not (prevPrev.isalnum() and next.isalnum()):
+        return True
+    elif next == ':' and not (prev.isdigit() and nextNext.isdigit()):
+        return True
+    elif next == '.' and not prev == '.' and not (prev.isdigit() and nextNext.isdigit()):
+        return True
+    elif next == '*' and not nextNext.isdigit():
+        return True
+    else:
+        return False
+
+
 def tokenizeAllSentences(sentences):
     # tokenize each sentence and separate tokens by a space
-    return list(map((lambda sentence: " ".join(tokenize(sentence))), sentences))
+    return map((lambda sentence: " ".join(tokenize(sentence))), sentences)
 
 ########################################################################################################
 ############################## Part 3: Tokenization Unit Tests #########################################
@@ -409,24 +586,31 @@ Result: True
 ############################# Part Main - input and output #############################################
 ########################################################################################################
 
-url = sys.argv[1]
+# Write every line to @f as it flows through the pipeline.
+def writeEach(f, lines):
+    for line in lines:
+        f.write(line + '\r\n')
+        yield line
+
+
+# The input is either a Ynet article url, or a local text file with a paragraph on each line.
+source = sys.argv[1]
 outputFolder = sys.argv[2]
 
 if not os.path.exists(outputFolder):
     os.makedirs(outputFolder)
 
-textParagraphs = getYnetText(url)
-sentences = toSentences(textParagraphs)
-tokenized = tokenizeAllSentences(sentences)
-
-with codecs.open(os.path.join(outputFolder, 'article.txt'), 'w', 'utf-8') as f:
-    for paragraph in textParagraphs:
-        f.write(paragraph + '\r\n')
-
-with codecs.open(os.path.join(outputFolder, 'article_sentences.txt'), 'w', 'utf-8') as f:
-    for sentence in sentences:
-        f.write(sentence + '\r\n')
-
-with codecs.open(os.path.join(outputFolder, 'article_tokenized.txt'), 'w', 'utf-8') as f:
-    for line in tokenized:
-        f.write(line + '\r\n')
+if os.path.isfile(source):
+    textParagraphs = readTextParagraphs(source)
+else:
+    textParagraphs = getYnetText(source)
+
+# Everything is lazy: each paragraph goes through the splitter and the tokenizer,
+# and is written to all 3 files before the next one is read.
+with codecs.open(os.path.join(outputFolder, 'article.txt'), 'w', 'utf-8') as articleFile, \
+        codecs.open(os.path.join(outputFolder, 'article_sentences.txt'), 'w', 'utf-8') as sentencesFile, \
+        codecs.open(os.path.join(outputFolder, 'article_tokenized.txt'), 'w', 'utf-8') as tokenizedFile:
+    paragraphs = writeEach(articleFile, textParagraphs)
+    sentences = writeEach(sentencesFile, toSentences(paragraphs))
+    for line in tokenizeAllSentences(sentences):
+        tokenizedFile.write(line + '\r\n')
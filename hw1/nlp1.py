@@ -1,23 +1,21 @@
 import requests
 from lxml import html
 from lxml import etree
-from io import StringIO
 import re
+import codecs
 
 # original article: http://www.ynet.co.il/articles/0,7340,L-4684564,00.html
 # Pi article: http://www.ynet.co.il/articles/0,7340,L-4636763,00.html
 def getYnetText(url):
     # Get the web page source html, as a string
     req = requests.get(url)
-    htmlStr = req.text
+    return ynetTextFromHtml(req.text)
 
-    # Parse the text as an XML tree, with error-correcting parsing for html.
-    htmlTree = etree.parse(StringIO(htmlStr), etree.HTMLParser())  # type: etree.ElementTree
-    # Pretty print it again to a string, now correct xml.
-    htmlStr2 = etree.tostring(htmlTree, pretty_print=True, encoding='UTF-8').decode("UTF-8")
 
-    # Parse again, but now with the convenient html api (the parsing from this api isn't error-correcting)
-    htmlTree = html.document_fromstring(htmlStr2)  # type: etree.ElementTree
+# The title, the subtitle and the paragraphs of a Ynet article, given its html source.
+def ynetTextFromHtml(htmlStr):
+    # Parse the text once, with the error-correcting html parser.
+    htmlTree = html.document_fromstring(htmlStr)  # type: etree.ElementTree
 
     # Get the title
     title = htmlTree.find_class('art_header_title')[0].text
@@ -28,7 +26,8 @@ def getYnetText(url):
     # go to span - the parent of all the paragraphs, and get the paragraphs.
     # the div contained p's that aren't sentences.
     # This returns a list of paragraphs, some containing breaks.
-    paragraphsRaw = htmlTree.find_class('art_body')[0].xpath("//span/p")
+    # The query is relative to the article body, so it only searches its subtree.
+    paragraphsRaw = htmlTree.find_class('art_body')[0].xpath(".//span/p")
 
     # Clean all the paragraphs, see the @clean function
     cleanedParagraphs = list(map((lambda x: clean(x.text_content())), paragraphsRaw))
@@ -39,9 +38,101 @@ def getYnetText(url):
     return [title, subtitle] + paragraphs
 
 
+# Same as @getYnetText, but the page is parsed while it's being downloaded. See @ynetTextFromChunks.
+def getYnetTextIncremental(url):
+    with requests.get(url, stream=True) as req:
+        return ynetTextFromChunks(req.iter_content(chunk_size=1 << 16, decode_unicode=True))
+
+
+def hasClass(element, name):
+    return name in (element.get('class') or '').split()
+
+
+# Same as @ynetTextFromHtml, but parses the html incrementally from an iterable of chunks (strings or bytes).
+# Every part of the tree we're done with is thrown away, so the memory doesn't grow with the size of the page.
+def ynetTextFromChunks(chunks):
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+
+    def events():
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+
+    titleElement = None
+    subtitleElement = None
+    bodyElement = None
+    title = None
+    subtitle = None
+    paragraphs = []
+    # The number of open elements whose subtree we still need: the first title, subtitle and article body.
+    needed = 0
+
+    for event, element in events():
+        if event == 'start':
+            # The first element of each class, like find_class(...)[0].
+            if titleElement is None and hasClass(element, 'art_header_title'):
+                titleElement = element
+                needed += 1
+            elif subtitleElement is None and hasClass(element, 'art_header_sub_title'):
+                subtitleElement = element
+                needed += 1
+            elif bodyElement is None and hasClass(element, 'art_body'):
+                bodyElement = element
+                needed += 1
+            continue
+
+        parent = element.getparent()
+        if element is titleElement:
+            title = element.text
+            needed -= 1
+        elif element is subtitleElement:
+            subtitle = element.text
+            needed -= 1
+        elif element is bodyElement:
+            needed -= 1
+        elif element.tag == 'p' and parent is not None and parent.tag == 'span' and parent is not bodyElement \
+                and isDescendant(parent, bodyElement):
+            # Same as x.text_content()
+            paragraph = clean(etree.tostring(element, method='text', encoding=str, with_tail=False))
+            if len(paragraph) > 0:
+                paragraphs.append(paragraph)
+            element.clear(keep_tail=True)
+
+        if needed == 0:
+            element.clear(keep_tail=True)
+            # Also drop the siblings we've already finished with.
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+
+    return [title, subtitle] + paragraphs
+
+
+def isDescendant(element, ancestor):
+    while element is not None:
+        if element is ancestor:
+            return True
+        element = element.getparent()
+    return False
+
+
+# Any run of newlines, tabs & spaces, except for a single space which is already clean.
+insignificantSpaces = re.compile("[ \n\xa0\t]{2,}|[\n\xa0\t]")
+
+
 def clean(p):
     # Eliminate all newlines & tabs, as they are insignificant in html.
-    noNewlines = re.sub(r"\n|\xa0|\t", " ", p)
     # Eliminate repeating spaces, as they are insignificant in html.
-    noDuplicateSpaces = re.sub(" +", " ", noNewlines)
-    return noDuplicateSpaces.strip()
+    # Both in one pass: each run of them becomes a single space.
+    return insignificantSpaces.sub(" ", p).strip()
+
+
+# Read the paragraphs of a (possibly huge) local text file, one paragraph per line, cleaned like the html ones.
+# A generator: the file is never read into memory as a whole.
+def readTextParagraphs(file):
+    with codecs.open(file, 'r', 'utf-8') as f:
+        for line in f:
+            paragraph = clean(line)
+            if len(paragraph) > 0:
+                yield paragraph
@@ -51,39 +51,43 @@ def splitToSentences(paragraph):
     # Also, "??" and "?!" should be considered as one.
     # Because e.g. "How many items did you buy? We bought 3. That's good."
     #   ^ The '.' here does indicate the end of a sentence.
+    # We walk over the paragraph with indices instead of rebuilding the remaining string and the prefix
+    # on every step, as that would be quadratic in the length of the paragraph.
+    # @start is the index where the current sentence begins (the prefix is paragraph[start:i]),
+    # and @i is the index of @before in the current window.
     sentences = []
-    prefix = ""
-    str = paragraph
+    n = len(paragraph)
+    start = 0
 
-    if len(str) == 1 and isTerminalChar(str[0]):
-        sentences.append(str[0])
-        str = str[1:]
-    elif len(str) > 1 and isEndOfSentence(False, "", str[0], str[1]):
-        sentences.append(str[0])
-        str = str[1:]
+    if n == 1 and isTerminalChar(paragraph[0]):
+        sentences.append(paragraph[0])
+        start = 1
+    elif n > 1 and isEndOfSentence(False, "", paragraph[0], paragraph[1]):
+        sentences.append(paragraph[0])
+        start = 1
 
-    inQuotes = False
-    if len(str) > 0:
-        inQuotes = str[0] == '"'
+    inQuotes = start < n and paragraph[start] == '"'
 
     # See pseudo-code below for explanation.
-    while len(str) > 2:
-        before = str[0]
-        current = str[1]
-        after = str[2]
-        rest = str[3:]
+    i = start
+    while n - i > 2:
+        before = paragraph[i]
+        current = paragraph[i + 1]
+        after = paragraph[i + 2]
         if isEndOfSentence(inQuotes, before, current, after):
-            sentences.append(prefix + before + current)
-            prefix = ""
-            str = after + rest
+            sentences.append(paragraph[start:i + 2])
+            # recurse on (after + rest)
+            start = i + 2
+            step = 2
         else:
-            prefix = prefix + before
-            str = current + after + rest
+            # recurse on (current + after + rest), the prefix grows by @before.
+            step = 1
 
         if isQuotationQuote(before, current, after):
             inQuotes = not inQuotes
-    if prefix + str != "":
-        sentences.append(prefix + str)
+        i += step
+    if start < n:
+        sentences.append(paragraph[start:])
     return sentences
 
 
@@ -135,9 +139,9 @@ Result: []
 
 
 def toSentences(paragraphs):
-    res = []
+    # A generator, so that a large text flows paragraph by paragraph.
     for p in paragraphs:
         # Each paragraph produces a list of sentences.
-        res.extend(splitToSentences(p))
-    # Sentences shouldn't start with a space - an artifact of splitting right after a dot.
-    return map((lambda sentence: sentence.strip()), res)
+        for sentence in splitToSentences(p):
+            # Sentences shouldn't start with a space - an artifact of splitting right after a dot.
+            yield sentence.strip()
@@ -12,26 +12,32 @@
 # "'" shouldn't be a separate token, it's used for letter alternatives or abbr.:
 # ג' ז' וכו'
 
+import re
+
 # Output the first token and the rest of the sentence.
 def eatToken(s):
     s = s.strip()  # Throw away spaces in the beginning (after we've eaten a word)
     if len(s) == 0:
         return None
 
-    i = 0
-    while 0 <= i < len(s) and not isNewToken(tryCharAt(s, i-1), s[i], tryCharAt(s, i + 1), tryCharAt(s, i + 2)):
-        i += 1
-
-    return s[0:i + 1], s[i + 1:]
+    start, end = next(tokenSpans(s))
+    return s[start:end], s[end:]
 
 
 def tokenize(s):
+    # Same as the tokens of @tokenSpans, without computing offsets in the whole sentence.
     tokens = []
-    while len(s) > 0:
-        token, rest = eatToken(s)
-        if token is not None:
-            tokens.append(token)
-        s = rest
+    for word in s.rstrip().split(' '):
+        if word.isalnum():
+            tokens.append(word)
+        elif not word:
+            continue
+        elif word[-1] in specialChars and word[:-1].isalnum():
+            # A word followed by a punctuation mark, such as 'word,' or 'word.'
+            tokens.append(word[:-1])
+            tokens.append(word[-1])
+        else:
+            tokens.extend(word[start:end] for start, end in wordTokenSpans(word, 0, len(word)))
     return tokens
 
 
@@ -72,6 +78,86 @@ def isNewToken(prevPrev, prev, next, nextNext):
 def alwaysToken(c):
     return c in " !?,();/\\+="
 
+
+# The tokenizer engine: walks the sentence once with a cursor and yields the (start, end) offsets of the tokens,
+# so a token is copied only if someone asks for it (see @tokenize).
+# It decides exactly like calling @eatToken repeatedly:
+#  * The whitespace before a token is skipped, and the sentence ends where its trailing whitespace starts.
+#  * Every token is examined on its own, so the window never looks before the start of the token.
+# A space is always a token, and for the other rules a space after the window is the same as the end of the string,
+#   so the words between the spaces can be tokenized independently.
+# Most of them are plain words or numbers, which are a token by themselves.
+# In the others, @isNewToken can only split around one of the special chars below,
+#   so between them we jump with a regex scan instead of examining every window.
+alwaysTokenChars = frozenset(" !?,();/\\+=")
+specialChars = alwaysTokenChars | frozenset('"-:.*')
+nextSpecialChar = re.compile('[' + re.escape(''.join(sorted(specialChars))) + ']')
+
+
+def tokenSpans(s):
+    end = len(s.rstrip())
+    pos = 0
+    for word in s[:end].split(' '):
+        wordEnd = pos + len(word)
+        if word.isalnum():
+            yield pos, wordEnd
+        elif word:
+            yield from wordTokenSpans(s, pos, wordEnd)
+        pos = wordEnd + 1
+
+
+# The token offsets in s[pos:end], which has no spaces.
+def wordTokenSpans(s, pos, end):
+    while True:
+        # Throw away spaces in the beginning (after we've eaten a word)
+        while pos < end and s[pos].isspace():
+            pos += 1
+        if pos >= end:
+            return
+
+        start = pos
+        i = start
+        # Find the first window (prev = s[i]) after which we split.
+        while i + 1 < end:
+            prev = s[i]
+            next = s[i + 1]
+            if prev not in specialChars and next not in specialChars:
+                # No rule can split here, jump to the window just before the next special char.
+                match = nextSpecialChar.search(s, i + 2, end)
+                if match is None:
+                    i = end - 1
+                    break
+                i = match.start() - 1
+                continue
+            if prev in alwaysTokenChars or next in alwaysTokenChars:
+                break
+            prevPrev = s[i - 1] if i > start else ""
+            nextNext = s[i + 2] if i + 2 < end else ""
+            if isNewTokenAt(prevPrev, prev, next, nextNext):
+                break
+            i += 1
+        # Here either we split after s[i], or s[i] is the last char. (then next = "", which is always a token)
+        pos = i + 1
+        yield start, pos
+
+
+# Same as @isNewToken, for a window with 4 actual chars around a special char,
+# when neither @prev nor @next is always a token.
+def isNewTokenAt(prevPrev, prev, next, nextNext):
+    if (next == '"' or next == '-') and not (prev.isalnum() and nextNext.isalnum()):
+        return True
+    elif prev == '"' and not (prevPrev.isalnum() and next.isalnum()):
+        return True
+    elif next == ':' and not (prev.isdigit() and nextNext.isdigit()):
+        return True
+    elif next == '.' and not prev == '.' and not (prev.isdigit() and nextNext.isdigit()):
+        return True
+    elif next == '*' and not nextNext.isdigit():
+        return True
+    else:
+        return False
+
+
 def tokenizeAllSentences(sentences):
     # tokenize each sentence and separate tokens by a space
     return map((lambda sentence: " ".join(tokenize(sentence))), sentences)
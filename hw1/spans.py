@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Sentences & tokens as offsets into the original paragraph, instead of new strings.
+# The offsets are kept in compact arrays (4 bytes per offset), and a string is made only when it's asked for,
+# so tokenizing a large corpus doesn't allocate a python object per token.
+# The boundaries are those of toSentences & tokenizeAllSentences. (found with the compiled engine)
+
+from array import array
+
+from hw1.compiled import sentenceSpans, tokenRegex
+
+
+# The offsets of s[start:end] without the whitespace around it, like s[start:end].strip()
+def strippedSpan(s, start, end):
+    while start < end and s[start].isspace():
+        start += 1
+    while end > start and s[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+# A sequence of strings given as offset pairs into a text: [text[spans[2i]:spans[2i+1]]].
+# Nothing is copied until an item is asked for.
+class SpanView:
+    # text: String
+    # spans: array('I') of start, end, start, end, ...
+    # first, last: the range of the pairs in @spans that are in the view.
+
+    def __init__(self, text, spans, first=0, last=None):
+        self.text = text
+        self.spans = spans
+        self.first = first
+        self.last = len(spans) // 2 if last is None else last
+
+    def __len__(self):
+        return self.last - self.first
+
+    def span(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        pair = 2 * (self.first + i)
+        return self.spans[pair], self.spans[pair + 1]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start, end = self.span(i)
+        return self.text[start:end]
+
+    def __iter__(self):
+        text = self.text
+        spans = self.spans
+        for pair in range(2 * self.first, 2 * self.last, 2):
+            yield text[spans[pair]:spans[pair + 1]]
+
+    def __repr__(self):
+        return 'SpanView(%r)' % list(self)
+
+
+class TokenizedParagraph:
+    # text: String - the paragraph.
+    # sentenceSpans: array('I') - start, end of every sentence.
+    # tokenSpans: array('I') - start, end of every token, of all the sentences.
+    # firstToken: array('I') - the tokens of sentence i are the pairs firstToken[i] until firstToken[i + 1].
+
+    def __init__(self, text, sentenceSpans, tokenSpans, firstToken):
+        self.text = text
+        self.sentenceSpans = sentenceSpans
+        self.tokenSpans = tokenSpans
+        self.firstToken = firstToken
+
+    def sentences(self):
+        return SpanView(self.text, self.sentenceSpans)
+
+    def tokens(self, sentence=None):
+        if sentence is None:
+            return SpanView(self.text, self.tokenSpans)
+        return SpanView(self.text, self.tokenSpans, self.firstToken[sentence], self.firstToken[sentence + 1])
+
+    # The sentence as a line of tokens separated by spaces, like tokenizeAllSentences.
+    def tokenizedLine(self, sentence):
+        return " ".join(self.tokens(sentence))
+
+    def __len__(self):
+        return len(self.firstToken) - 1
+
+
+def tokenizeParagraph(paragraph):
+    sentences = array('I')
+    tokens = array('I')
+    firstToken = array('I', [0])
+    regex = tokenRegex()
+    for start, end in sentenceSpans(paragraph):
+        start, end = strippedSpan(paragraph, start, end)
+        sentences.append(start)
+        sentences.append(end)
+        for match in regex.finditer(paragraph, start, end):
+            tokens.extend(match.span(1))
+        firstToken.append(len(tokens) // 2)
+    return TokenizedParagraph(paragraph, sentences, tokens, firstToken)
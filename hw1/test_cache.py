@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import tempfile
+import threading
+from unittest import TestCase
+
+from hw1.cache import *
+
+
+class TestCache(TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.folder = self.temp.name
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def test_putGet(self):
+        cache = ArticleCache(self.folder)
+        cache.put('http://a/1', '<html>א</html>', ['כותרת', 'פסקה'], '"e"', 'Mon, 01 Jan 2018 00:00:00 GMT')
+        self.assertEqual(cache.get('http://a/1'),
+                         {'url': 'http://a/1', 'etag': '"e"', 'lastModified': 'Mon, 01 Jan 2018 00:00:00 GMT',
+                          'paragraphs': ['כותרת', 'פסקה']})
+        self.assertEqual(cache.html('http://a/1'), '<html>א</html>')
+        self.assertIsNone(cache.get('http://a/2'))
+
+    def test_getEvictedMeanwhile(self):
+        cache = ArticleCache(self.folder)
+        cache.put('http://a/1', '<html></html>', ['x'])
+        # removed by another thread's evict, after get found the entry.
+        for path in cache.paths(urlKey('http://a/1')):
+            os.remove(path)
+        self.assertIsNone(cache.get('http://a/1'))
+        self.assertIsNone(cache.html('http://a/1'))
+
+    def test_orphanHtmlRemoved(self):
+        cache = ArticleCache(self.folder)
+        cache.put('http://a/1', '<html></html>', ['x'])
+        # a put that crashed after writing the html.
+        orphan = os.path.join(self.folder, urlKey('http://a/2') + '.html')
+        with open(orphan, 'w') as f:
+            f.write('<html>' + 'x' * 1000 + '</html>')
+        reopened = ArticleCache(self.folder)
+        self.assertFalse(os.path.exists(orphan))
+        self.assertEqual(list(reopened.entries), [urlKey('http://a/1')])
+        self.assertEqual(reopened.totalBytes, cache.totalBytes)
+
+    def test_concurrentPutsOfTheSameUrl(self):
+        cache = ArticleCache(self.folder)
+        errors = []
+
+        def put(i):
+            try:
+                for _ in range(20):
+                    cache.put('http://a/1', '<html>%d</html>' % i, [str(i)])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=put, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertIn(cache.html('http://a/1'), ['<html>%d</html>' % j for j in range(8)])
+        # and no temporary file is left.
+        self.assertEqual(sorted(os.listdir(self.folder)), sorted(map(os.path.basename, cache.paths(urlKey('http://a/1')))))
+
+    def test_reopen(self):
+        ArticleCache(self.folder).put('http://a/1', '<html></html>', ['x'])
+        self.assertEqual(ArticleCache(self.folder).get('http://a/1')['paragraphs'], ['x'])
+
+    def test_evictLeastRecentlyUsed(self):
+        page = 'x' * 1000
+        cache = ArticleCache(self.folder, maxBytes=3500)
+        cache.put('http://a/1', page, [])
+        cache.put('http://a/2', page, [])
+        cache.put('http://a/3', page, [])
+        cache.get('http://a/1')
+        cache.put('http://a/4', page, [])
+        self.assertIsNotNone(cache.get('http://a/1'))
+        self.assertIsNone(cache.get('http://a/2'))
+        self.assertIsNotNone(cache.get('http://a/4'))
+        self.assertLessEqual(cache.totalBytes, 3500)
+        self.assertEqual(len(os.listdir(self.folder)), 2 * len(cache.entries))
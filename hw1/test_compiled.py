@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Differential tests: the compiled engine against the rules of nlp2 & nlp3.
+import codecs
+import os
+import random
+from unittest import TestCase
+
+from hw1 import nlp2
+from hw1 import nlp3
+from hw1.compiled import *
+
+# All the chars that appear in the rules, and a few that don't.
+alphabet = 'ab12²  ."!?:;,-*\t\xa0\nאב()/\'=+\\'
+
+
+def randomStrings(count, seed):
+    generator = random.Random(seed)
+    for _ in range(count):
+        yield ''.join(generator.choice(alphabet) for _ in range(generator.randint(0, 20)))
+
+
+def hebrewParagraphs():
+    path = os.path.join(os.path.dirname(__file__), '..', 'hw2', 'datasets', 'devset', 'wikipedia.txt')
+    with codecs.open(path, 'r', 'utf-8') as f:
+        return [line.strip() for line in f if len(line.strip()) > 0][:2000]
+
+
+class TestCompiled(TestCase):
+    def test_tokenizeRandom(self):
+        for s in randomStrings(20000, 1):
+            self.assertEqual(tokenize(s), nlp3.tokenize(s), repr(s))
+            self.assertEqual(list(tokenSpans(s)), list(nlp3.tokenSpans(s)), repr(s))
+
+    def test_splitToSentencesRandom(self):
+        for s in randomStrings(20000, 2):
+            self.assertEqual(splitToSentences(s), nlp2.splitToSentences(s), repr(s))
+
+    def test_hebrew(self):
+        paragraphs = hebrewParagraphs()
+        sentences = list(nlp2.toSentences(paragraphs))
+        self.assertEqual(list(toSentences(paragraphs)), sentences)
+        self.assertEqual(list(tokenizeAllSentences(sentences)), list(nlp3.tokenizeAllSentences(sentences)))
+
+    def test_examples(self):
+        self.assertEqual(tokenize('הוא אמר: "ק"מ זה חשוב". "מסכים."'),
+                         ['הוא', 'אמר', ':', '"', 'ק"מ', 'זה', 'חשוב', '"', '.', '"', 'מסכים', '.', '"'])
+        self.assertEqual(splitToSentences('What is the time? he said: "The time is 13:30". I answered: "Are you sure?".'),
+                         ['What is the time?', ' he said:', ' "The time is 13:30".', ' I answered:', ' "Are you sure?".'])
+
+    def test_engine(self):
+        self.assertEqual(engine('compiled'), (toSentences, tokenize))
+        self.assertEqual(engine('rules'), (nlp2.toSentences, nlp3.tokenize))
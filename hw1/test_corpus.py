@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import codecs
+import tempfile
+from unittest import TestCase
+
+from hw1.corpus import *
+from hw1.nlp2 import toSentences
+from hw1.nlp3 import tokenizeAllSentences
+
+documents = {
+    'a.txt': 'Hello world! How are you doing today??\nשלום .3.14 מה שלומך?\n\n',
+    'b.txt': 'הוא אמר: "ק"מ זה חשוב". "מסכים."\n',
+    'c.txt': '',
+    'd.txt': 'He said: "Pi is tasty", but he did not understand...\n' * 50,
+}
+
+
+def readLines(file):
+    with codecs.open(file, 'r', 'utf-8') as f:
+        return f.read().split('\r\n')[:-1]
+
+
+class TestCorpus(TestCase):
+    def test_tokenizeCorpus(self):
+        with tempfile.TemporaryDirectory() as inputFolder, tempfile.TemporaryDirectory() as outputFolder:
+            for name, text in documents.items():
+                with codecs.open(os.path.join(inputFolder, name), 'w', 'utf-8') as f:
+                    f.write(text)
+
+            workers = tokenizeCorpus(inputFolder, outputFolder, processes=2)
+
+            self.assertEqual(sum(worker[0] for worker in workers.values()), len(documents))
+            for name, text in documents.items():
+                sentences = list(toSentences(readTextParagraphs(os.path.join(inputFolder, name))))
+                prefix = os.path.join(outputFolder, outputName(name))
+                self.assertEqual(readLines(prefix + '_sentences.txt'), sentences)
+                self.assertEqual(readLines(prefix + '_tokenized.txt'), list(tokenizeAllSentences(sentences)))
+
+    def test_sameOutputName(self):
+        with tempfile.TemporaryDirectory() as inputFolder, tempfile.TemporaryDirectory() as outputFolder:
+            for name in ['a.txt', 'a.md', 'b.txt']:
+                with codecs.open(os.path.join(inputFolder, name), 'w', 'utf-8') as f:
+                    f.write('Hello world.\n')
+            with self.assertRaises(ValueError) as raised:
+                tokenizeCorpus(inputFolder, outputFolder, processes=2)
+            self.assertIn('a.md, a.txt', str(raised.exception))
+            self.assertEqual(os.listdir(outputFolder), [])
+
+    def test_tokenizeCorpusCompiled(self):
+        with tempfile.TemporaryDirectory() as inputFolder, tempfile.TemporaryDirectory() as rulesFolder, \
+                tempfile.TemporaryDirectory() as compiledFolder:
+            for name, text in documents.items():
+                with codecs.open(os.path.join(inputFolder, name), 'w', 'utf-8') as f:
+                    f.write(text)
+
+            tokenizeCorpus(inputFolder, rulesFolder, processes=2, engineName='rules')
+            tokenizeCorpus(inputFolder, compiledFolder, processes=2, engineName='compiled')
+
+            for file in os.listdir(rulesFolder):
+                self.assertEqual(readLines(os.path.join(compiledFolder, file)), readLines(os.path.join(rulesFolder, file)))
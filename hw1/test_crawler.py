@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import TestCase
+
+from hw1.cache import ArticleCache, urlKey
+from hw1.crawler import *
+
+# A saved Ynet article, stripped down to the parts we read.
+ynetPage = '''<html><head><title>ynet</title></head><body>
+<div class="art_header_title">כותרת</div>
+<div class="art_header_sub_title">כותרת משנה</div>
+<div class="art_body"><span>
+<p>שלום עולם. מה שלומך?</p>
+<p>  </p>
+<p>הוא אמר: "ק"מ זה חשוב".</p>
+</span></div>
+</body></html>'''
+
+
+class YnetStandIn(BaseHTTPRequestHandler):
+    # path -> number of 503 answers before the page is served.
+    failures = {}
+    # path -> number of requests.
+    requests = {}
+
+    def do_GET(self):
+        self.requests[self.path] = self.requests.get(self.path, 0) + 1
+        if self.failures.get(self.path, 0) > 0:
+            self.failures[self.path] -= 1
+            self.send_response(503)
+            self.end_headers()
+        elif self.path.startswith('/articles/') and self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+        elif self.path.startswith('/articles/'):
+            body = ynetPage.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestCrawler(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), YnetStandIn)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = 'http://127.0.0.1:%d' % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_crawlKeepsOrder(self):
+        urls = [self.base + '/articles/%d.html' % i for i in range(20)]
+        results = list(crawl(urls, workers=4, perHostDelay=0))
+        self.assertEqual([url for url, _, _ in results], urls)
+        for url, paragraphs, error in results:
+            self.assertIsNone(error)
+            self.assertEqual(paragraphs, ['כותרת', 'כותרת משנה', 'שלום עולם. מה שלומך?', 'הוא אמר: "ק"מ זה חשוב".'])
+
+    def test_crawlReportsErrors(self):
+        results = list(crawl([self.base + '/missing', self.base + '/articles/1.html'], workers=2, perHostDelay=0))
+        self.assertIsNone(results[0][1])
+        self.assertIsNotNone(results[0][2])
+        self.assertIsNone(results[1][2])
+
+    def test_crawlRetries(self):
+        YnetStandIn.failures['/articles/flaky.html'] = 2
+        [(url, paragraphs, error)] = crawl([self.base + '/articles/flaky.html'], perHostDelay=0, backoff=0)
+        self.assertIsNone(error)
+        self.assertEqual(paragraphs[0], 'כותרת')
+
+    def test_hostRateLimiter(self):
+        limiter = HostRateLimiter(0.05)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.wait('http://example.com/a')
+        limiter.wait('http://other.example.com/a')
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+        self.assertLess(time.monotonic() - start, 0.15 + 0.5)
+
+    def test_crawlFromCache(self):
+        url = self.base + '/articles/cached.html'
+        with tempfile.TemporaryDirectory() as folder:
+            cache = ArticleCache(folder)
+            [(_, fetched, _)] = crawl([url], perHostDelay=0, cache=cache)
+            [(_, cached, _)] = crawl([url], perHostDelay=0, cache=cache)
+            self.assertEqual(cached, fetched)
+            self.assertEqual(YnetStandIn.requests['/articles/cached.html'], 1)
+            self.assertEqual(cache.get(url)['etag'], '"v1"')
+            self.assertEqual(cache.html(url), ynetPage)
+
+    def test_crawlRefreshRevalidates(self):
+        url = self.base + '/articles/refreshed.html'
+        with tempfile.TemporaryDirectory() as folder:
+            cache = ArticleCache(folder)
+            [(_, fetched, _)] = crawl([url], perHostDelay=0, cache=cache)
+            [(_, refreshed, error)] = crawl([url], perHostDelay=0, cache=cache, refresh=True)
+            self.assertIsNone(error)
+            self.assertEqual(refreshed, fetched)
+            self.assertEqual(YnetStandIn.requests['/articles/refreshed.html'], 2)
+
+    def test_crawlRefreshParsesAgain(self):
+        url = self.base + '/articles/stale.html'
+        with tempfile.TemporaryDirectory() as folder:
+            cache = ArticleCache(folder)
+            # as if it was parsed by an older ynetTextFromHtml.
+            cache.put(url, ynetPage, ['old'], '"v1"')
+            [(_, refreshed, error)] = crawl([url], perHostDelay=0, cache=cache, refresh=True)
+            self.assertIsNone(error)
+            self.assertEqual(refreshed, ynetTextFromHtml(ynetPage))
+            self.assertEqual(cache.get(url)['paragraphs'], refreshed)
+            self.assertEqual(YnetStandIn.requests['/articles/stale.html'], 1)
+
+    def test_crawlRefreshWithoutHtml(self):
+        url = self.base + '/articles/nohtml.html'
+        with tempfile.TemporaryDirectory() as folder:
+            cache = ArticleCache(folder)
+            cache.put(url, ynetPage, ['old'], '"v1"')
+            os.remove(cache.paths(urlKey(url))[1])
+            [(_, refreshed, error)] = crawl([url], perHostDelay=0, cache=cache, refresh=True)
+            self.assertIsNone(error)
+            self.assertEqual(refreshed, ynetTextFromHtml(ynetPage))
+            self.assertEqual(cache.html(url), ynetPage)
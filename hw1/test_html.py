@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+from hw1.nlp1 import *
+
+ynetPage = '''<!DOCTYPE html>
+<html><head><title>ynet</title><script>var p = "<p>not text</p>";</script></head><body>
+<div class="menu"><span><p>תפריט</p></span></div>
+<div class="art_header"><h1 class="art_header_title">כותרת&nbsp;ראשית</h1>
+<div class="art_header_sub_title">כותרת משנה</div></div>
+<div class="art_body main"><div class="caption"><p>כיתוב תמונה</p></div><span>
+<p>שלום עולם.<br>מה   שלומך?</p>
+<p>&nbsp; </p>
+<p>הוא אמר: "ק"מ <b>זה</b> חשוב".<!-- comment --></p>
+</span></div>
+<div class="footer"><span><p>כל הזכויות שמורות</p></span></div>
+</body></html>'''
+
+expected = ['כותרת\xa0ראשית', 'כותרת משנה', 'שלום עולם.מה שלומך?', 'הוא אמר: "ק"מ זה חשוב".']
+
+
+class TestHtml(TestCase):
+    def test_ynetTextFromHtml(self):
+        self.assertEqual(ynetTextFromHtml(ynetPage), expected)
+
+    def test_ynetTextFromChunks(self):
+        self.assertEqual(ynetTextFromChunks([ynetPage]), expected)
+
+    def test_ynetTextFromSmallChunks(self):
+        chunks = [ynetPage[i:i + 7] for i in range(0, len(ynetPage), 7)]
+        self.assertEqual(ynetTextFromChunks(chunks), expected)
+
+    def test_ynetTextFromBytes(self):
+        data = ynetPage.replace('<head>', '<head><meta charset="utf-8">').encode('utf-8')
+        self.assertEqual(ynetTextFromChunks([data[i:i + 5] for i in range(0, len(data), 5)]), expected)
+
+    def test_clean(self):
+        self.assertEqual(clean(' a\n\tb\xa0 c  '), 'a b c')
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+
+from hw1.nlp2 import toSentences
+from hw1.nlp3 import tokenize
+from hw1.spans import *
+from hw1.test_compiled import hebrewParagraphs, randomStrings
+
+
+class TestSpans(TestCase):
+    def assertSameAsStrings(self, paragraph):
+        tokenized = tokenizeParagraph(paragraph)
+        sentences = list(toSentences([paragraph]))
+        self.assertEqual(list(tokenized.sentences()), sentences, repr(paragraph))
+        self.assertEqual([list(tokenized.tokens(i)) for i in range(len(tokenized))],
+                         [tokenize(sentence) for sentence in sentences], repr(paragraph))
+
+    def test_tokenizeParagraph(self):
+        tokenized = tokenizeParagraph('Hello. He said: "Hi there! Hello."')
+        self.assertEqual(list(tokenized.sentences()), ['Hello.', 'He said:', '"Hi there!', 'Hello."'])
+        self.assertEqual(tokenized.tokens(2).span(0), (16, 17))
+        self.assertEqual(tokenized.tokens(2)[-1], '!')
+        self.assertEqual(tokenized.tokens(1)[0:2], ['He', 'said'])
+        self.assertEqual(tokenized.tokenizedLine(3), 'Hello . "')
+        self.assertEqual(len(tokenized.tokens()), 12)
+        self.assertEqual(tokenized.tokenSpans.typecode, 'I')
+
+    def test_empty(self):
+        tokenized = tokenizeParagraph('')
+        self.assertEqual(len(tokenized), 0)
+        self.assertEqual(list(tokenized.tokens()), [])
+
+    def test_random(self):
+        for paragraph in randomStrings(5000, 3):
+            self.assertSameAsStrings(paragraph)
+
+    def test_hebrew(self):
+        for paragraph in hebrewParagraphs()[:500]:
+            self.assertSameAsStrings(paragraph)
@@ -34,6 +34,19 @@ class TestTokenize(TestCase):
     def test_time(self):
         self.assertEqual(tokenize("13:15:00"), ["13:15:00"])
 
+    def test_tokenizeOtherWhitespace(self):
+        self.assertEqual(tokenize("\tab\t cd\t"), ['ab\t', 'cd'])
+
+    def test_tokenizeOnlySpaces(self):
+        self.assertEqual(tokenize("   "), [])
+
+    def test_tokenSpans(self):
+        self.assertEqual(list(tokenSpans('  He said: "k"m".')),
+                         [(2, 4), (5, 9), (9, 10), (11, 12), (12, 15), (15, 16), (16, 17)])
+
+    def test_eatToken(self):
+        self.assertEqual(eatToken(' "k"m" hi'), ('"', 'k"m" hi'))
+
     def test_split01(self):
         self.assertEqual(split('lo..'), True)
 
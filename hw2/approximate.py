@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# An approximate counting mode, for corpora too large to keep all their distinct n-grams.
+# The PMIs are only of n-grams whose tokens all appear at least min_occurrences times, and most of the distinct
+# n-grams have a rare token. So a first pass only estimates the counts of the tokens, in a count-min sketch,
+# and finds the heavy bigrams (for the raw frequencies) with a Misra-Gries summary, both in a fixed memory.
+# The second pass counts exactly, but only the n-grams whose tokens may pass the threshold or are in a heavy bigram.
+#
+# The sketch only over-estimates, so an n-gram that passes the threshold is never missed, and the PMIs are
+# the exact ones. Misra-Gries under-estimates its counts, but keeps every bigram that's more than
+# #bigrams / (heavy_hitters + 1) of them. So a bigram that wasn't counted appears less than min_occurrences times,
+# and at most #bigrams / (heavy_hitters + 1) times, and the raw frequencies are exact when the 100th best count
+# is above that.
+# (epsilon & delta only bound how many rare tokens are counted needlessly, i.e. the memory)
+
+import math
+import zlib
+from array import array
+
+import numpy as np
+
+from ngram_tables import *
+
+# A second hash of a token, for the rows of the sketch.
+SECOND_HASH_SEED = 0x9E3779B9
+# A token that isn't counted in the second pass.
+SKIPPED = -2
+
+
+# token_hashes: [Token] -> ([crc32], [crc32 with another seed])
+def token_hashes(tokens):
+    encoded = [token.encode('utf-8') for token in tokens]
+    return [zlib.crc32(e) for e in encoded], [zlib.crc32(e, SECOND_HASH_SEED) for e in encoded]
+
+
+# Estimates the counts of hashed items with @depth rows of @width counters: every item adds to a counter in
+# each row, and its estimate is the smallest of them. An estimate is never below the real count, and is
+# above it by more than epsilon * #items with probability at most delta.
+class CountMinSketch:
+    def __init__(self, epsilon, delta):
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = max(1, int(math.ceil(math.log(1 / delta))))
+        self.table = np.zeros((self.depth, self.width), np.int64)
+
+    # The counter of every item in every row, by double hashing: (h1 + row * h2) % width.
+    def columns(self, h1, h2):
+        rows = np.arange(self.depth, dtype=np.int64)[:, None]
+        return (h1[None, :] + rows * (h2[None, :] | 1)) % self.width
+
+    def add(self, h1, h2):
+        for row, columns in enumerate(self.columns(h1, h2)):
+            self.table[row] += np.bincount(columns, minlength=self.width)
+
+    def estimate(self, h1, h2):
+        rows = np.arange(self.depth)[:, None]
+        return self.table[rows, self.columns(h1, h2)].min(axis=0)
+
+
+# Finds the heavy hitters of a stream of int64 keys with @capacity counters: every key that's more than
+# #keys / (capacity + 1) of the stream is kept (with an under-estimated count).
+# The keys come in batches, each merged into the summary like a mergeable Misra-Gries summary:
+# when there are more than @capacity counters, the (capacity + 1)-th largest count is subtracted from all of them.
+class MisraGries:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.keys = np.zeros(0, np.int64)
+        self.counts = np.zeros(0, np.int64)
+
+    def add(self, keys):
+        keys, counts = np.unique(keys, return_counts=True)
+        keys, counts = merge_counts([(self.keys, self.counts), (keys, counts.astype(np.int64))])
+        if len(keys) > self.capacity:
+            cut = np.partition(counts, len(counts) - self.capacity - 1)[len(counts) - self.capacity - 1]
+            counts = counts - cut
+            kept = counts > 0
+            keys, counts = keys[kept], counts[kept]
+        self.keys, self.counts = keys, counts
+
+
+# Chunks of the tokens of the sentences, as (tokens, h1, h2), where h1 & h2 are int64 arrays of the hashes,
+# with BOUNDARY between the sentences (and None in tokens).
+def hashed_chunks(sentences, chunk_tokens):
+    tokens = []
+    h1 = array('q')
+    h2 = array('q')
+    for sentence in sentences:
+        sentence_tokens = sentence.split(' ')
+        first, second = token_hashes(sentence_tokens)
+        tokens.extend(sentence_tokens)
+        tokens.append(None)
+        h1.extend(first)
+        h1.append(BOUNDARY)
+        h2.extend(second)
+        h2.append(BOUNDARY)
+        if len(tokens) >= chunk_tokens:
+            yield tokens, np.frombuffer(h1, dtype=np.int64), np.frombuffer(h2, dtype=np.int64)
+            tokens = []
+            h1 = array('q')
+            h2 = array('q')
+    yield tokens, np.frombuffer(h1, dtype=np.int64), np.frombuffer(h2, dtype=np.int64)
+
+
+# approximate_tables: (() -> [Sentence]), min_occurrences, epsilon, delta, heavy_hitters -> NGramTables
+# Two passes over the sentences, so @read_sentences is called twice. The tables have the n-grams of the tokens
+# that may appear at least @min_occurrences times or are in a heavy bigram, and the totals of the whole corpus.
+def approximate_tables(read_sentences, min_occurrences, epsilon=1e-6, delta=0.01, heavy_hitters=10000,
+                       chunk_tokens=1 << 20):
+    sketch = CountMinSketch(epsilon, delta)
+    heavy_bigrams = MisraGries(heavy_hitters)
+    totals = np.zeros(3, np.int64)
+    for _, h1, h2 in hashed_chunks(read_sentences(), chunk_tokens):
+        inside = h1 >= 0
+        sketch.add(h1[inside], h2[inside])
+        bigrams = inside[:-1] & inside[1:]
+        trigrams = bigrams[:-1] & inside[2:]
+        heavy_bigrams.add((h1[:-1][bigrams] << 32) | h1[1:][bigrams])
+        totals += (inside.sum(), bigrams.sum(), trigrams.sum())
+    # a crc32 from 2^31 up makes the key negative, so the shift is masked too.
+    heavy_tokens = np.unique(np.concatenate(((heavy_bigrams.keys >> 32) & 0xFFFFFFFF,
+                                             heavy_bigrams.keys & 0xFFFFFFFF)))
+
+    counter = TablesCounter()
+    id = counter.vocabulary.id
+    for tokens, h1, h2 in hashed_chunks(read_sentences(), chunk_tokens):
+        ids = np.where(h1 >= 0, SKIPPED, BOUNDARY)
+        inside = np.flatnonzero(h1 >= 0)
+        counted = (sketch.estimate(h1[inside], h2[inside]) >= min_occurrences) | np.isin(h1[inside], heavy_tokens)
+        for i in inside[counted].tolist():
+            ids[i] = id(tokens[i])
+        counter.add(ids)
+    return counter.tables(totals)
+
+
+# The largest count a bigram that wasn't counted by approximate_tables may have.
+def uncounted_bigram_bound(tables, min_occurrences, heavy_hitters):
+    return min(min_occurrences - 1, tables.num_bigrams // (heavy_hitters + 1))
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Association measures of n-grams, computed on whole arrays of counts at once.
+# Every n-gram is seen as a pair of its (n-1)-gram prefix and its last token, with the 2x2 contingency table:
+#                     last token    other token
+#   prefix            o11           o12
+#   other prefix      o21           o22
+# A measure is a function of a Contingency to a Double array, registered by name in @measures,
+# so adding one is adding a function, and all the measures share the same counts.
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from ngram_tables import *
+
+
+# The cells of the contingency tables of a whole array of n-grams, as Double arrays.
+class Contingency(namedtuple('Contingency', ['o11', 'o12', 'o21', 'o22'])):
+    @property
+    def total(self):
+        return self.o11 + self.o12 + self.o21 + self.o22
+
+    # The count of the prefix, and of the last token. (the marginals)
+    @property
+    def prefix(self):
+        return self.o11 + self.o12
+
+    @property
+    def last(self):
+        return self.o11 + self.o21
+
+    # The expected counts of the cells if the prefix and the last token were independent.
+    def expected(self):
+        total = self.total
+        other_prefix = self.o21 + self.o22
+        other_last = self.o12 + self.o22
+        return (self.prefix * self.last / total, self.prefix * other_last / total,
+                other_prefix * self.last / total, other_prefix * other_last / total)
+
+
+# contingency: NGramTables, n, keys of n-grams -> Contingency
+def contingency(tables, n, keys):
+    o11 = tables.counts_of(n, keys).astype(np.float64)
+    prefix = tables.counts_of(n - 1, prefix_keys(keys, n))
+    last = tables.unigrams[key_ids(keys, n, n - 1)]
+    o12 = prefix - o11
+    o21 = last - o11
+    # the prefix & last token counts are of all the corpus, so the rest may come out a little negative.
+    o22 = np.maximum(tables.total(n) - o11 - o12 - o21, 0)
+    return Contingency(o11, o12, o21, o22)
+
+
+########################################################################################################
+############################## Measures ################################################################
+########################################################################################################
+
+def pmi(table):
+    return np.log(table.o11 * table.total / (table.prefix * table.last)) / math.log(2)
+
+
+def t_score(table):
+    return (table.o11 - table.expected()[0]) / np.sqrt(table.o11)
+
+
+# An n-gram whose prefix or last token is in every n-gram (a margin of 0) has no association, so it scores 0.
+def chi_square(table):
+    o11, o12, o21, o22 = table
+    margins = table.prefix * table.last * (o21 + o22) * (o12 + o22)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(margins > 0, table.total * (o11 * o22 - o12 * o21) ** 2 / margins, 0)
+
+
+# Dunning's log likelihood ratio: 2 * sum(o * ln(o / e)), over the cells, where 0 * ln(0) = 0.
+def log_likelihood(table):
+    ratio = np.zeros(len(table.o11))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for observed, expected in zip(table, table.expected()):
+            ratio += np.where(observed > 0, observed * np.log(observed / expected), 0)
+    return 2 * ratio
+
+
+def dice(table):
+    return 2 * table.o11 / (table.prefix + table.last)
+
+
+measures = {
+    'pmi': pmi,
+    't_score': t_score,
+    'chi_square': chi_square,
+    'llr': log_likelihood,
+    'dice': dice,
+}
+
+
+# score_ngrams: NGramTables, n, [measure name], min_occurrences -> Map[measure name, Scores of n-grams]
+# The n-grams whose tokens all appear at least @min_occurrences times, scored by every measure,
+# from a single contingency table.
+def score_ngrams(tables, n, names, min_occurrences=1):
+    if not 2 <= n <= 3:
+        raise ValueError("the tables have the counts of bigrams & trigrams, not of %d-grams" % n)
+    keys = tables.ngram_keys(n)
+    keys = keys[tables.frequent(n, keys, min_occurrences)]
+    table = contingency(tables, n, keys)
+    return {name: (keys, measures[name](table)) for name in names}
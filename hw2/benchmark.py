@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# Benchmark of the collocations pipeline, on the datasets and on synthetic corpora 10x & 100x as large.
+# Run: python hw2/benchmark.py [--quick] [--processes N] [--json results.json] [--update-baseline]
+#
+# Every corpus runs through count_folder & output_all_collocations_metrics, like hw2.py does, in a fresh process,
+# so the RSS is its own. We report the wall time of every stage (read, count, score, top-k, format, write), taken
+# from the records of instrumentation.py, the peak RSS of the process and of its largest worker (with
+# --processes), and the sizes of the vocabulary & count tables.
+# (with more than one process the files are read inside the workers, so the read time is part of count)
+# The outputs are compared to the hashes in benchmark_baseline.json, so an optimization that changes a single
+# byte of the output fails the run.
+
+import argparse
+import codecs
+import hashlib
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count, get_context
+
+import instrumentation
+from hw2 import *
+
+datasets = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datasets')
+baseline_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+
+###############################################################################################
+############################# Corpora #########################################################
+###############################################################################################
+
+# make_synthetic: base folder, factor, folder -> IO ()
+# @factor copies of every file of the base corpus, each with its sentences shuffled, and with about 1 in 50 tokens
+# made unique to its copy, so the vocabulary & the distinct n-grams keep growing like in a larger real corpus.
+def make_synthetic(base_folder, factor, folder):
+    os.makedirs(folder, exist_ok=True)
+    for file in sorted(os.listdir(base_folder)):
+        sentences = list(file_sentences(os.path.join(base_folder, file)))
+        for copy in range(factor):
+            rng = random.Random('%s/%d' % (file, copy))
+            shuffled = sentences[:]
+            rng.shuffle(shuffled)
+            def variant(token):
+                return token + '~%d' % copy if rng.random() < 0.02 else token
+            with codecs.open(os.path.join(folder, '%03d_%s' % (copy, file)), 'w', 'utf-8') as f:
+                f.write("\n".join(" ".join(map(variant, sentence.split(' '))) for sentence in shuffled))
+
+
+def output_hashes(output_folder):
+    hashes = {}
+    for file in sorted(os.listdir(output_folder)):
+        with open(os.path.join(output_folder, file), 'rb') as f:
+            hashes[file] = hashlib.sha256(f.read()).hexdigest()
+    return hashes
+
+
+###############################################################################################
+############################# Stages ##########################################################
+###############################################################################################
+
+# Runs in a fresh process: the whole pipeline on a corpus, measured stage by stage.
+# run_corpus: name, input folder, output folder, processes -> IO Map[String, _] (a row of the report)
+def run_corpus(name, input_folder, output_folder, processes):
+    instrumentation.enable('table', report_at_exit=False)
+    start = time.perf_counter()
+    tables = count_folder(input_folder, processes)
+    output_all_collocations_metrics(tables, output_folder)
+    seconds = time.perf_counter() - start
+
+    walls = {row['stage']: row['wall'] for row in instrumentation.summary(instrumentation.records)}
+    read = walls.get('read')
+    stages = {'read': read, 'count': walls['count'] - (read or 0.0)}
+    for stage_name in ('score', 'top-k', 'format', 'write'):
+        stages[stage_name] = walls.get(stage_name, 0.0)
+
+    vocabulary_bytes = sys.getsizeof(tables.vocabulary.ids) + sys.getsizeof(tables.vocabulary.tokens) + \
+                       sum(sys.getsizeof(token) for token in tables.vocabulary.tokens)
+    table_bytes = sum(getattr(tables, array).nbytes for array in INDEX_ARRAYS)
+    # the workers of --processes are processes of their own, whose largest peak is of RUSAGE_CHILDREN.
+    # (ru_maxrss is in KB)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    workers_peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+    # every sentence has one token more than bigrams.
+    return {'corpus': name, 'processes': processes, 'sentences': tables.num_unigrams - tables.num_bigrams,
+            'tokens': tables.num_unigrams, 'vocabulary': len(tables.vocabulary), 'bigrams': len(tables.bigram_keys),
+            'trigrams': len(tables.trigram_keys), 'vocabulary_bytes': vocabulary_bytes, 'table_bytes': table_bytes,
+            'stages': stages, 'seconds': seconds, 'peak_rss': peak_rss, 'workers_peak_rss': workers_peak_rss,
+            'hashes': output_hashes(output_folder)}
+
+
+def run_all(quick=False, processes=1):
+    work = tempfile.mkdtemp(prefix='hw2_benchmark_')
+    try:
+        corpora = [('devset', os.path.join(datasets, 'devset')), ('testset', os.path.join(datasets, 'testset'))]
+        for factor in (10,) if quick else (10, 100):
+            folder = os.path.join(work, 'testset_x%d' % factor)
+            make_synthetic(os.path.join(datasets, 'testset'), factor, folder)
+            corpora.append(('testset x%d' % factor, folder))
+        results = []
+        for name, folder in corpora:
+            # not a Pool, whose daemonic workers can't start the processes of count_folder.
+            with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as executor:
+                output_folder = os.path.join(work, 'output', name)
+                results.append(executor.submit(run_corpus, name, folder, output_folder, processes).result())
+            if folder.startswith(work):
+                shutil.rmtree(folder)
+        return results
+    finally:
+        shutil.rmtree(work)
+
+
+###############################################################################################
+############################# Report ##########################################################
+###############################################################################################
+
+def print_table(results):
+    print("%-14s %10s %8s %9s %9s %8s %8s %8s %8s %8s %8s %8s %9s %10s" %
+          ("corpus", "tokens", "vocab", "bigrams", "trigrams", "read", "count", "score", "top-k", "format",
+           "write", "total", "peak MB", "worker MB"))
+    for result in results:
+        stages = result['stages']
+        read = "%.2f" % stages['read'] if stages['read'] is not None else "-"
+        workers = "%.1f" % (result['workers_peak_rss'] / 2 ** 20) if result['workers_peak_rss'] else "-"
+        print("%-14s %10d %8d %9d %9d %8s %8.2f %8.2f %8.2f %8.2f %8.2f %8.2f %9.1f %10s" %
+              (result['corpus'], result['tokens'], result['vocabulary'], result['bigrams'], result['trigrams'],
+               read, stages['count'], stages['score'], stages['top-k'], stages['format'], stages['write'],
+               result['seconds'], result['peak_rss'] / 2 ** 20, workers))
+
+
+# The corpora whose outputs aren't byte identical to the baseline.
+def compare_to_baseline(results, baseline):
+    return [result['corpus'] for result in results
+            if result['corpus'] in baseline and baseline[result['corpus']] != result['hashes']]
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Benchmark the hw2 collocations pipeline.')
+    arg_parser.add_argument('--quick', action='store_true', help='without the 100x corpus')
+    arg_parser.add_argument('--processes', type=int, default=cpu_count(),
+                            help='count the files in this many processes, like hw2.py (default: #cores)')
+    arg_parser.add_argument('--json', help='write the results to this file')
+    arg_parser.add_argument('--update-baseline', action='store_true',
+                            help='save the hashes of the outputs as the new baseline')
+    args = arg_parser.parse_args()
+
+    results = run_all(args.quick, args.processes)
+    print_table(results)
+    if args.json:
+        with codecs.open(args.json, 'w', 'utf-8') as f:
+            json.dump({'python': sys.version, 'results': results}, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(baseline_file):
+        with codecs.open(baseline_file, 'r', 'utf-8') as f:
+            baseline = json.load(f)
+    if args.update_baseline:
+        baseline.update({result['corpus']: result['hashes'] for result in results})
+        with codecs.open(baseline_file, 'w', 'utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+    else:
+        changed = compare_to_baseline(results, baseline)
+        for corpus in changed:
+            print("the output on %s isn't identical to the baseline" % corpus, file=sys.stderr)
+        sys.exit(1 if changed else 0)
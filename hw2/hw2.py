@@ -3,127 +3,94 @@
 #   Ilan Godik       - 316315332
 #   Charlie Mubariky - 316278118
 
+import argparse
 import re
 import codecs
+import hashlib
+import heapq
+import json
 import math
 import os
-import sys
-
-# flatMap: [a], (a -> [b]) -> [b]
-def flatMap(list, f):
-    list_out = []
-    for e in list:
-        list_out.extend(f(e))
-    return list_out
-
-# returns the sliding windows of size n of the list.
-# window: [A] -> [(a1, a2, ..., an)]
-def window(list, n):
-    return [tuple(list[i:i + n]) for i in range(len(list) - n + 1)]
-
-def dict_filter_keys(dict, p):
-    return {k:v for k,v in dict.items() if p(k)}
-
-def dict_map_values(dict, f):
-    return {k:f(v) for k,v in dict.items()}
-
-# n_grams: (lines: [String]) -> [(w1, w2, ..., wn)]
-def n_grams(sentences, n):
-    def sentence_grams(sentence):
-        tokens = sentence.split(' ')
-        return window(tokens, n)
-    return flatMap(sentences, sentence_grams)
-
-# get_unigrams: [Sentence] -> [Token = String]
-def get_unigrams(sentences):
-    # unpack the tuple of length 1
-    return [t for (t,) in n_grams(sentences, 1)]
-
-# get_bigrams: [String] -> [(String, String)]
-def get_bigrams(sentences):
-    return n_grams(sentences, 2)
-
-# get_trigrams: [String] -> [(String, String, String)]
-def get_trigrams(sentences):
-    return n_grams(sentences, 3)
-
-# count_frequencies: List[A] -> Map[A, Int (#occurences)]
-def count_frequencies(elements):
-    # foldMap (Map(_ -> 1))
-    counts = {}
-    for e in elements:
-        if e not in counts:
-            counts[e] = 1
-        else:
-            counts[e] += 1
-    return counts
+import shutil
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from approximate import *
+from association import measures, score_ngrams
+from instrumentation import enable, stage, traced
+from ngram_tables import *
+
+###############################################################################################
+############################# Metrics #########################################################
+###############################################################################################
+
+# The n-grams are counted once into NGramTables (see ngram_tables.py), and shared by all the metrics.
+# A metric is a Scores = (keys: n-gram keys array, scores: Double array), computed on whole arrays at once.
+
+def log2(values):
+    return np.log(values) / math.log(2)
 
 # problem: we were asked to divide by #unigrams in raw_frequency, not by #bigrams.
-# count_probabilities: List[A] -> Map[A, Double (prob. max likelihood estimation)]
-def count_probabilities(elements, total):
-    frequencies = count_frequencies(elements)
-    def normalize(freq):
-        return freq / total
-    # frequencies.map(normalize)
-    return {k: normalize(v) for k, v in frequencies.items()}
-
-# raw_frequency: [String] -> Map[(String, String), Double]
-def raw_frequency(sentences):
-    tokens = get_unigrams(sentences)
-    num_tokens = len(tokens)
-    bigrams = get_bigrams(sentences)
-    return count_probabilities(bigrams, num_tokens)
-
-def bigram_pmi(sentences):
-    tokens = get_unigrams(sentences)
-    unigram_frequencies = count_probabilities(tokens, len(tokens))
-    bigrams = get_bigrams(sentences)
-    bigram_frequencies = count_probabilities(bigrams, len(bigrams))
-    def pmi(pxy, px, py):
-        return math.log(pxy / (px * py), 2)
-
-    return {(x, y): pmi(pxy, unigram_frequencies[x], unigram_frequencies[y])
-                    for (x, y), pxy in bigram_frequencies.items()}
-
-# bigram_pmi_filtered: k:Int, [String] -> Map[Bigram, PMI], s.t. each bigram appears at least k times in the corpus.
-def bigram_pmi_filtered(sentences, k):
-    bigram_pmis = bigram_pmi(sentences)
-    unigrams = get_unigrams(sentences)
-    unigrams_freq = count_frequencies(unigrams)
-    return dict_filter_keys(bigram_pmis, lambda bigram: all(unigrams_freq[token] >= k for token in bigram))
-
-# trigram_pmi: [String], (pmi_f: (unigrams_p, bigrams_p, trigrams_p, trigram) -> double)), k: Int -> Map[Trigram, PMI],
-# s.t. each trigram appears at least @k times in the corpus.
-def trigram_pmi(sentences, pmi_f, k):
-    unigrams = get_unigrams(sentences)
-    unigrams_p = count_probabilities(unigrams, len(unigrams))
-    unigrams_f = count_frequencies(unigrams)
-    bigrams = get_bigrams(sentences)
-    bigrams_p = count_probabilities(bigrams, len(bigrams))
-    trigrams = get_trigrams(sentences)
-    trigrams_p = count_probabilities(trigrams, len(trigrams))
-    trigram_pmis = {trigram: math.log(pmi_f(unigrams_p, bigrams_p, trigrams_p, trigram), 2)
-                        for trigram in trigrams}
-    return dict_filter_keys(trigram_pmis, lambda trigram: all(unigrams_f[token] >= k for token in trigram))
-
-def pmi_a(unigrams_p, bigrams_p, trigrams_p, trigram):
-    x, y, z = trigram
-    return trigrams_p[trigram] / (unigrams_p[x] * unigrams_p[y] * unigrams_p[z])
-
-def pmi_b(unigrams_p, bigrams_p, trigrams_p, trigram):
-    x, y, z = trigram
-    return trigrams_p[trigram] / (bigrams_p[(x, y)] * bigrams_p[(y, z)])
-
-def pmi_c(unigrams_p, bigrams_p, trigrams_p, trigram):
-    x, y, z = trigram
-    return trigrams_p[trigram] / (unigrams_p[x] * unigrams_p[y] * unigrams_p[z] * bigrams_p[(x, y)] * bigrams_p[(y, z)])
+# raw_frequency: NGramTables -> Scores of bigrams
+def raw_frequency(tables):
+    return tables.bigram_keys, tables.bigram_counts / tables.num_unigrams
+
+# unigram_probabilities: NGramTables, n-gram keys, n, i -> p(the i-th token of each n-gram)
+def unigram_probabilities(tables, keys, n, i):
+    return tables.unigrams[key_ids(keys, n, i)] / tables.num_unigrams
+
+# bigram_pmi: NGramTables, [keys] -> Scores of the bigrams (of all of them, by default)
+def bigram_pmi(tables, keys=None):
+    if keys is None:
+        keys, counts = tables.bigram_keys, tables.bigram_counts
+    else:
+        counts = tables.counts_of(2, keys)
+    pxy = counts / tables.num_bigrams
+    px = unigram_probabilities(tables, keys, 2, 0)
+    py = unigram_probabilities(tables, keys, 2, 1)
+    return keys, log2(pxy / (px * py))
+
+# bigram_pmi_filtered: NGramTables, k:Int -> Scores of bigrams, s.t. each token appears at least k times in the corpus.
+# Only the bigrams that pass the filter are scored.
+def bigram_pmi_filtered(tables, k):
+    return bigram_pmi(tables, tables.bigram_keys[tables.frequent(2, tables.bigram_keys, k)])
+
+# trigram_probabilities: NGramTables, k: Int -> (keys, (px, py, pz, pxy, pyz, pxyz)),
+# of the trigrams whose tokens all appear at least @k times in the corpus, and only of them.
+def trigram_probabilities(tables, k):
+    frequent = tables.frequent(3, tables.trigram_keys, k)
+    keys = tables.trigram_keys[frequent]
+    pxyz = tables.trigram_counts[frequent] / tables.num_trigrams
+    px, py, pz = (unigram_probabilities(tables, keys, 3, i) for i in range(3))
+    xy = pack_keys([key_ids(keys, 3, 0), key_ids(keys, 3, 1)])
+    yz = pack_keys([key_ids(keys, 3, 1), key_ids(keys, 3, 2)])
+    pxy = tables.counts_of(2, xy) / tables.num_bigrams
+    pyz = tables.counts_of(2, yz) / tables.num_bigrams
+    return keys, (px, py, pz, pxy, pyz, pxyz)
+
+# trigram_pmi: NGramTables, (pmi_f: (px, py, pz, pxy, pyz, pxyz) -> Double array), k: Int -> Scores of trigrams,
+# s.t. each token appears at least @k times in the corpus.
+def trigram_pmi(tables, pmi_f, k, probabilities=None):
+    keys, parts = probabilities or trigram_probabilities(tables, k)
+    return keys, log2(pmi_f(*parts))
+
+def pmi_a(px, py, pz, pxy, pyz, pxyz):
+    return pxyz / (px * py * pz)
+
+def pmi_b(px, py, pz, pxy, pyz, pxyz):
+    return pxyz / (pxy * pyz)
+
+def pmi_c(px, py, pz, pxy, pyz, pxyz):
+    return pxyz / (px * py * pz * pxy * pyz)
 
 # top: k: Int, Map[A, B Ordered] -> List[(A, B)] Sorted on B, with only top k elements.
+# Sorted on score (index 1) descending, then by the (bi/tri)gram lexicographically. (index 0)
+# Negating the score lets the tuple (-score, collocation) order both at once.
+# A bounded heap of the k best so far: O(n log k) time, O(k) memory, and an item worse than the k-th best
+# so far is dropped after a single comparison. Nothing but the top k is ever sorted.
 def top(k, scored):
-    return sorted(sorted(scored.items(), key=lambda pair: pair[0]), key = lambda pair: pair[1], reverse=True)[:k]
-# Sort on score (index 1), then by the (bi/tri)gram lexicographically. (index 0)
-# No proper handling of Orders in python, so we can't use the lexicographical ordering imposed by tuples.
-#   (we need to partially reverse the order)
+    return heapq.nsmallest(k, scored.items(), key=lambda pair: (-pair[1], pair[0]))
 
 
 ###############################################################################################
@@ -149,48 +116,283 @@ def format_collocations_metric(collocations, top_size = 100, spaces_between_coll
         #                                 ^ to have a space between the collocations and the score.
     return "\r\n".join(map(lambda collocation_score: format_collocation(*collocation_score), sorted_frequencies))
 
-# normalized_raw_frequencies: [Sentence: String] -> Map[Bigram, Freq * 1000 : Double]
-def formatted_raw_frequencies(sentences):
-    frequencies = raw_frequency(sentences)
-    return dict_map_values(frequencies, lambda freq: freq * 1000)
+# formatted_raw_frequencies: NGramTables -> Scores of bigrams, Freq * 1000
+def formatted_raw_frequencies(tables):
+    keys, frequencies = raw_frequency(tables)
+    return keys, frequencies * 1000
+
+# The top of the scores, as a tabular string view.
+def format_scores(tables, n, scores, top_size = 100):
+    keys, values = scores
+    with stage('top-k') as selecting:
+        candidates = tables.top_candidates(n, keys, values, top_size)
+        selecting.items = len(keys)
+    with stage('format'):
+        return format_collocations_metric(candidates, top_size)
 
 
 ###############################################################################################
 ########################### Input & Output ####################################################
 ###############################################################################################
 
-def file_sentences(file):
-    with codecs.open(file, 'r', 'utf-8') as f:
-        text = f.read()
+# Inside a line, '\xa0' and tabs separate sentences too.
+in_line_separators = re.compile("[\xa0\t]")
+repeating_spaces = re.compile(" {2,}")
 
-    return re.sub(" +", " ", re.sub(r"(\r\n)+|\n+|\xa0|\t", "\n", text)).split("\n")
+def collapse_spaces(sentence):
+    return repeating_spaces.sub(" ", sentence) if "  " in sentence else sentence
 
+# file_sentences: file -> Iterator[Sentence]
+# The sentences are read a line at a time, so a file is never in memory as a whole. They are separated by
+# newlines, '\xa0's and tabs, where a run of '\r\n's or a run of '\n's is a single separator,
+# and repeating spaces are collapsed into one.
+def file_sentences(file):
+    # binary, so lines are split only on '\n'. (utf-8 never has a '\n' byte inside a character)
+    with open(file, 'rb') as f:
+        sentence = ""
+        previous_newline = None
+        for line in f:
+            line = line.decode('utf-8')
+            if line.endswith('\r\n'):
+                newline, content = '\r\n', line[:-2]
+            elif line.endswith('\n'):
+                newline, content = '\n', line[:-1]
+            else:
+                newline, content = None, line
+            if content == "" and newline == previous_newline:
+                # continues the run of newlines of the previous line.
+                continue
+            parts = in_line_separators.split(content)
+            sentence += parts[0]
+            for part in parts[1:]:
+                yield collapse_spaces(sentence)
+                sentence = part
+            if newline is not None:
+                yield collapse_spaces(sentence)
+                sentence = ""
+            previous_newline = newline
+        yield collapse_spaces(sentence)
+
+# all_texts: folder -> Iterator[Sentence], of all the files in the folder.
 def all_texts(input_folder):
-    files = map(lambda file: os.path.join(input_folder, file), os.listdir(input_folder))
-    return flatMap(files, file_sentences)
+    for file in os.listdir(input_folder):
+        yield from file_sentences(os.path.join(input_folder, file))
+
+# count_file: file -> NGramTables. (in a worker)
+def count_file(file):
+    return count_tables(file_sentences(file))
+
+# count_files: [file], processes: Int -> Iterator[NGramTables], of every file, in their order.
+def count_files(files, processes=1):
+    if processes <= 1:
+        yield from map(count_file, files)
+    else:
+        with Pool(processes) as pool:
+            yield from pool.imap(count_file, files)
+
+# count_folder: folder, processes: Int -> NGramTables, of all the files in the folder.
+# With more than one process, every worker counts whole files, and the tables are merged as they come back,
+# in the order of the files. The merged tables are identical to the serial ones.
+def count_folder(input_folder, processes=1):
+    with stage('count') as counting:
+        if processes <= 1:
+            tables = count_tables(traced('read', all_texts(input_folder)))
+        else:
+            files = [os.path.join(input_folder, file) for file in os.listdir(input_folder)]
+            tables = merge_tables(traced('count files', count_files(files, processes)))
+        counting.items = tables.num_unigrams
+    return tables
+
+
+###############################################################################################
+########################### Incremental index #################################################
+###############################################################################################
+
+# An index that follows the changes of the input folder, instead of being counted from scratch:
+#   meta.json, ... (save_tables) - the totals of all the counted files.
+#   manifest.json                - Map[file name, sha256 of its content] of the counted files.
+#   files/<sha256>/              - the tables of every counted file, to subtract when it's changed or removed.
+
+def file_hash(file):
+    digest = hashlib.sha256()
+    with open(file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_manifest(index_folder):
+    path = os.path.join(index_folder, 'manifest.json')
+    if not is_index(index_folder) or not os.path.isfile(path):
+        return {}
+    with codecs.open(path, 'r', 'utf-8') as f:
+        return json.load(f)
+
+def write_manifest(index_folder, manifest):
+    path = os.path.join(index_folder, 'manifest.json')
+    with codecs.open(path + '.tmp', 'w', 'utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(path + '.tmp', path)
+
+# update_index: input folder, index folder, processes: Int -> IO NGramTables, of all the files in the input folder.
+# Only the files that were added, changed or removed since the last update are counted (or subtracted).
+def update_index(input_folder, index_folder, processes=1):
+    manifest = read_manifest(index_folder)
+    hashes = {file: file_hash(os.path.join(input_folder, file)) for file in os.listdir(input_folder)}
+    removed = [file for file, hash in manifest.items() if hashes.get(file) != hash]
+    added = [file for file, hash in hashes.items() if manifest.get(file) != hash]
+    if manifest and not removed and not added:
+        return load_tables(index_folder)
+    files_folder = os.path.join(index_folder, 'files')
+    os.makedirs(files_folder, exist_ok=True)
+
+    def parts():
+        if manifest:
+            yield load_tables(index_folder)
+        for file in removed:
+            yield negated(load_tables(os.path.join(files_folder, manifest[file])))
+        added_files = [os.path.join(input_folder, file) for file in added]
+        for file, tables in zip(added, count_files(added_files, processes)):
+            save_tables(tables, os.path.join(files_folder, hashes[file]))
+            yield tables
+
+    tables = merge_tables(parts())
+    # the old manifest doesn't match the new totals, so a run that stops before the new manifest is written
+    # finds no manifest, and counts all the files again.
+    manifest_path = os.path.join(index_folder, 'manifest.json')
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    save_tables(tables, index_folder)
+    write_manifest(index_folder, hashes)
+    for hash in set(os.listdir(files_folder)) - set(hashes.values()):
+        shutil.rmtree(os.path.join(files_folder, hash))
+    return tables
+
+
+###############################################################################################
+########################### Output ############################################################
+###############################################################################################
 
 def write_to_file(folder, file, body):
     with codecs.open(os.path.join(folder, file), 'w', 'utf-8') as f:
         f.write(body)
 
-def output_all_collocations_metrics(sentences, output_folder):
-    min_occurrences = 20
-
+# all_metrics: NGramTables, min_occurrences -> Iterator[(output file, n, Scores of n-grams)]
+def all_metrics(tables, min_occurrences = 20):
+    yield 'freq_raw.txt', 2, formatted_raw_frequencies(tables)
+    yield 'pmi_pair.txt', 2, bigram_pmi_filtered(tables, min_occurrences)
+    # the probabilities of the filtered trigrams are shared by the three PMIs.
+    probabilities = trigram_probabilities(tables, min_occurrences)
+    yield 'pmi_tri_a.txt', 3, trigram_pmi(tables, pmi_a, min_occurrences, probabilities)
+    yield 'pmi_tri_b.txt', 3, trigram_pmi(tables, pmi_b, min_occurrences, probabilities)
+    yield 'pmi_tri_c.txt', 3, trigram_pmi(tables, pmi_c, min_occurrences, probabilities)
+
+def output_all_collocations_metrics(tables, output_folder, min_occurrences = 20):
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
-    raw_frequencies = formatted_raw_frequencies(sentences)
-    write_to_file(output_folder, 'freq_raw.txt', format_collocations_metric(raw_frequencies))
-    bigram_pmis = bigram_pmi_filtered(sentences, min_occurrences)
-    write_to_file(output_folder, 'pmi_pair.txt', format_collocations_metric(bigram_pmis))
-    trigram_pmis_a = trigram_pmi(sentences, pmi_a, min_occurrences)
-    write_to_file(output_folder, 'pmi_tri_a.txt', format_collocations_metric(trigram_pmis_a))
-    trigram_pmis_b = trigram_pmi(sentences, pmi_b, min_occurrences)
-    write_to_file(output_folder, 'pmi_tri_b.txt', format_collocations_metric(trigram_pmis_b))
-    trigram_pmis_c = trigram_pmi(sentences, pmi_c, min_occurrences)
-    write_to_file(output_folder, 'pmi_tri_c.txt', format_collocations_metric(trigram_pmis_c))
-
-input_folder = sys.argv[1]
-output_folder = sys.argv[2]
-
-sentences = all_texts(input_folder)
-output_all_collocations_metrics(sentences, output_folder)
+    for file, n, scores in traced('score', all_metrics(tables, min_occurrences)):
+        body = format_scores(tables, n, scores)
+        with stage('write'):
+            write_to_file(output_folder, file, body)
+
+# output_measures: NGramTables, output folder, [measure name], [n], min_occurrences -> IO ()
+# Writes <measure>_<n>.txt for every measure & n, all of the same counts.
+def output_measures(tables, output_folder, names, sizes, min_occurrences = 20):
+    if not names:
+        return
+    for n in sizes:
+        with stage('score measures') as scoring:
+            scored = score_ngrams(tables, n, names, min_occurrences)
+            scoring.items = len(names)
+        for name, scores in scored.items():
+            write_to_file(output_folder, '%s_%d.txt' % (name, n), format_scores(tables, n, scores))
+
+# A report of how the top lists of the approximate mode compare to the exact ones.
+def approximation_report(exact, approximate, min_occurrences, heavy_hitters, top_size = 100):
+    lines = ["distinct bigrams: %d exact, %d approximate" % (len(exact.bigram_keys), len(approximate.bigram_keys)),
+             "distinct trigrams: %d exact, %d approximate" % (len(exact.trigram_keys), len(approximate.trigram_keys)),
+             "a bigram that wasn't counted appears at most %d times" %
+                 uncounted_bigram_bound(approximate, min_occurrences, heavy_hitters),
+             "",
+             pad("metric", 16) + pad("identical", 12) + "top %d overlap" % top_size]
+    metrics = zip(all_metrics(exact, min_occurrences), all_metrics(approximate, min_occurrences))
+    for (file, n, exact_scores), (_, _, approximate_scores) in metrics:
+        exact_top = top(top_size, exact.top_candidates(n, *exact_scores, top_size))
+        approximate_top = top(top_size, approximate.top_candidates(n, *approximate_scores, top_size))
+        overlap = len(set(c for c, _ in exact_top) & set(c for c, _ in approximate_top))
+        lines.append(pad(file, 16) + pad(str(exact_top == approximate_top), 12) + "%d/%d" % (overlap, len(exact_top)))
+    return "\r\n".join(lines)
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Find the collocations of a folder of tokenized texts.',
+                                         epilog='The texts may have up to %d distinct tokens.' % MAX_VOCABULARY)
+    arg_parser.add_argument('input_folder', help='a folder of tokenized texts, or an index saved with --save-index')
+    arg_parser.add_argument('output_folder')
+    arg_parser.add_argument('--processes', type=int,
+                            help='count the files in this many processes (default: #cores)')
+    arg_parser.add_argument('--save-index', metavar='FOLDER',
+                            help='save the counts to this folder, to be given as the input of later runs')
+    arg_parser.add_argument('--update-index', metavar='FOLDER',
+                            help='keep the counts in this folder, and count only the files that changed since the '
+                                 'last run with it')
+    arg_parser.add_argument('--approximate', action='store_true',
+                            help='count in two passes, only the n-grams of the tokens that may be frequent enough')
+    arg_parser.add_argument('--epsilon', type=float, default=1e-6,
+                            help='approximate: the error of the token count estimates, as a fraction of #tokens')
+    arg_parser.add_argument('--delta', type=float, default=0.01,
+                            help='approximate: the probability of an estimate to be off by more than epsilon')
+    arg_parser.add_argument('--heavy-hitters', type=int, default=10000,
+                            help='approximate: the number of counters for the frequent bigrams')
+    arg_parser.add_argument('--compare-exact', metavar='FILE',
+                            help='approximate: count exactly too, and write a report comparing the top lists')
+    arg_parser.add_argument('--measures', nargs='+', choices=sorted(measures), default=[],
+                            help='also write the top n-grams by these association measures')
+    arg_parser.add_argument('--sizes', nargs='+', type=int, choices=[2, 3], default=[2, 3],
+                            help='the n of the n-grams scored by --measures: 2 and/or 3, as only the bigrams & '
+                                 'trigrams are counted')
+    arg_parser.add_argument('--min-occurrences', type=int, default=20,
+                            help='the PMIs are of n-grams whose tokens all appear at least this many times')
+    arg_parser.add_argument('--trace', nargs='?', const='table', metavar='JSON',
+                            help='measure every stage, and print a table of them at exit, or write them to a '
+                                 'JSON file (ending with .json). With ",memory" (e.g. table,memory) the tracemalloc '
+                                 'peaks too, which slows the run (also enabled by the HW2_TRACE env var)')
+    args = arg_parser.parse_args()
+    # the approximate tables have only the n-grams of the frequent tokens, so they're never kept as an index.
+    if args.approximate:
+        if args.save_index or args.update_index:
+            arg_parser.error('--approximate counts only some of the n-grams, so it cannot be saved as an index')
+        if is_index(args.input_folder):
+            arg_parser.error('--approximate counts the texts of a folder, not an index')
+        if args.processes is not None and not args.compare_exact:
+            arg_parser.error('--approximate counts in a single process, --processes is only of --compare-exact')
+    elif args.compare_exact:
+        arg_parser.error('--compare-exact is of --approximate')
+    if args.processes is None:
+        args.processes = cpu_count()
+    if args.trace:
+        try:
+            enable(args.trace)
+        except ValueError as e:
+            arg_parser.error(str(e))
+
+    # count once, for all the metrics.
+    if args.approximate:
+        with stage('approximate count'):
+            tables = approximate_tables(lambda: traced('read', all_texts(args.input_folder)), args.min_occurrences,
+                                        args.epsilon, args.delta, args.heavy_hitters)
+        if args.compare_exact:
+            exact = count_folder(args.input_folder, args.processes)
+            write_to_file('.', args.compare_exact, approximation_report(
+                exact, tables, args.min_occurrences, args.heavy_hitters))
+    elif args.update_index:
+        with stage('update index'):
+            tables = update_index(args.input_folder, args.update_index, args.processes)
+    elif is_index(args.input_folder):
+        with stage('load index'):
+            tables = load_tables(args.input_folder)
+    else:
+        tables = count_folder(args.input_folder, args.processes)
+    if args.save_index:
+        with stage('save index'):
+            save_tables(tables, args.save_index)
+    output_all_collocations_metrics(tables, args.output_folder, args.min_occurrences)
+    output_measures(tables, args.output_folder, args.measures, args.sizes, args.min_occurrences)
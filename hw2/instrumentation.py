@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# Opt-in instrumentation of the stages of the pipeline: wall time, CPU time, #items, and the tracemalloc peak.
+# Enabled by the HW2_TRACE env var or hw2.py --trace: 'table' (or '1') prints a summary table to stderr at exit,
+# and a file name ending with .json is where a JSON trace of every stage is written to.
+# Adding ',memory' (e.g. 'table,memory') measures the peaks too. It's off by default, as tracemalloc slows down
+# every allocation, so the times of a run with it are several times longer.
+# When it's disabled, stage() is a shared no-op context manager and traced() returns the iterable itself,
+# so the instrumented code pays a function call per stage, and nothing per item.
+#
+#   with stage('count') as counting:
+#       tables = ...
+#       counting.items = tables.num_unigrams
+#   for sentence in traced('read', sentences): ...
+
+import atexit
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# None when disabled, otherwise 'table' or a JSON file.
+target = None
+# Whether the tracemalloc peaks are measured.
+memory = False
+# The finished stages, in the order they finished.
+records = []
+# The running stages, the innermost last.
+running = []
+started = time.perf_counter()
+
+
+class NoStage:
+    items = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+
+no_stage = NoStage()
+
+
+class Stage:
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = 0
+
+    # Starts (or resumes) measuring. The tracemalloc peak is reset for every stage, so the peak of the
+    # stage it's inside of is kept first.
+    def resume(self):
+        if memory:
+            if running:
+                running[-1].peak = max(running[-1].peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        running.append(self)
+        self.resumed_wall = time.perf_counter()
+        self.resumed_cpu = time.process_time()
+
+    def pause(self):
+        self.wall += time.perf_counter() - self.resumed_wall
+        self.cpu += time.process_time() - self.resumed_cpu
+        running.pop()
+        if memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            if running:
+                running[-1].peak = max(running[-1].peak, self.peak)
+
+    def __enter__(self):
+        self.start = time.perf_counter() - started
+        self.resume()
+        return self
+
+    def __exit__(self, *exception):
+        self.pause()
+        self.finish()
+        return False
+
+    def finish(self):
+        records.append({'stage': self.name, 'inside': [stage.name for stage in running], 'start': self.start,
+                        'wall': self.wall, 'cpu': self.cpu, 'items': self.items,
+                        'peak': self.peak if memory else None})
+
+
+# stage: name -> a context manager measuring the code inside it.
+def stage(name):
+    return Stage(name) if target is not None else no_stage
+
+
+# traced: name, Iterable[A] -> Iterable[A]
+# Measures the time spent producing the items (only that, not the code consuming them), and counts them.
+def traced(name, iterable):
+    if target is None:
+        return iterable
+    return traced_items(Stage(name), iterable)
+
+
+def traced_items(measured, iterable):
+    measured.start = time.perf_counter() - started
+    iterator = iter(iterable)
+    try:
+        while True:
+            measured.resume()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                measured.pause()
+            measured.items += 1
+            yield item
+    finally:
+        measured.finish()
+
+
+########################################################################################################
+############################## Reporting ###############################################################
+########################################################################################################
+
+# summary: [record] -> [{stage, calls, wall, cpu, items, peak}], a row of the totals of every stage,
+# in the order the stages first finished. (peak is None when it wasn't measured)
+def summary(records):
+    stages = {}
+    for record in records:
+        row = stages.setdefault(record['stage'], {'stage': record['stage'], 'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+                                                  'items': 0, 'peak': None})
+        row['calls'] += 1
+        row['wall'] += record['wall']
+        row['cpu'] += record['cpu']
+        row['items'] += record['items']
+        if record['peak'] is not None:
+            row['peak'] = max(row['peak'] or 0, record['peak'])
+    return list(stages.values())
+
+
+def print_summary(records, file=sys.stderr):
+    print("%-24s %6s %10s %10s %12s %12s %10s" % ("stage", "calls", "wall", "cpu", "items", "items/sec", "peak MB"),
+          file=file)
+    for row in summary(records):
+        peak = "%.1f" % (row['peak'] / 2 ** 20) if row['peak'] is not None else "-"
+        print("%-24s %6d %10.3f %10.3f %12d %12.0f %10s" %
+              (row['stage'], row['calls'], row['wall'], row['cpu'], row['items'],
+               row['items'] / max(row['wall'], 1e-9), peak), file=file)
+
+
+def report():
+    if target in ('table', '1'):
+        print_summary(records)
+    else:
+        with open(target, 'w') as f:
+            json.dump({'stages': records, 'summary': summary(records)}, f, indent=2)
+
+
+# parse_spec: 'table', '1' or a .json file, [',memory'] -> (target, whether to measure the peaks)
+# Anything else is an error, rather than the name of a file to write to. (like HW2_TRACE=0)
+def parse_spec(spec):
+    parts = spec.split(',')
+    first = parts[0] if parts[0] not in ('', 'memory') else 'table'
+    if first not in ('table', '1') and not first.endswith('.json') or any(part != 'memory' for part in parts[1:]):
+        raise ValueError("a trace is 'table', '1' or a .json file, optionally followed by ',memory', not %r" % spec)
+    return first, 'memory' in parts
+
+
+# enable: spec (see parse_spec) -> IO (), measuring from now on, and reporting at exit.
+# (unless @report_at_exit is False, for a caller that reports the records itself)
+def enable(spec, report_at_exit=True):
+    global target, memory
+    parsed_target, parsed_memory = parse_spec(spec)
+    if target is None and report_at_exit:
+        atexit.register(report)
+    target = parsed_target
+    if parsed_memory:
+        memory = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+if os.environ.get('HW2_TRACE'):
+    enable(os.environ['HW2_TRACE'])
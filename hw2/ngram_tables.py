@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+# Compact n-gram count tables for the collocation metrics of hw2.
+# The tokens are interned to int ids by a Vocabulary, and the n-grams are packed into keys of ID_BITS bits per id:
+# a bigram into an int64, and a trigram into a row of two int64s, the key of its first two tokens & the last id.
+# The keys are kept as a sorted NumPy array of the distinct keys next to an array of their counts.
+# That's 16 (or 24) bytes per distinct n-gram, instead of a dict entry of a tuple of strings,
+# and lets the metrics be computed as array expressions.
+
+import json
+import os
+from array import array
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+ID_BITS = 31
+MAX_VOCABULARY = 1 << ID_BITS
+ID_MASK = MAX_VOCABULARY - 1
+# Between the sentences of a flat array of token ids, so no n-gram crosses a sentence.
+BOUNDARY = -1
+# While all the ids fit in this many bits, the rows of trigram keys are sorted as a single int64 of the 3 ids.
+SHORT_ID_BITS = 21
+SHORT_ID_MASK = (1 << SHORT_ID_BITS) - 1
+
+
+# Vocabulary: Token = String <-> Int
+class Vocabulary:
+    def __init__(self, tokens=()):
+        self.tokens = list(tokens)
+        self.ids = {token: id for id, token in enumerate(self.tokens)}
+
+    def __len__(self):
+        return len(self.tokens)
+
+    # id: Token -> Int, adding the token if it's new.
+    def id(self, token):
+        id = self.ids.get(token)
+        if id is None:
+            id = len(self.tokens)
+            if id >= MAX_VOCABULARY:
+                raise ValueError("more than %d distinct tokens can't be packed into the n-gram keys" % MAX_VOCABULARY)
+            self.ids[token] = id
+            self.tokens.append(token)
+        return id
+
+    # encode: [Token] -> [Int]
+    def encode(self, tokens):
+        ids = self.ids
+        try:
+            return [ids[token] for token in tokens]
+        except KeyError:
+            return [self.id(token) for token in tokens]
+
+    # decode: n-gram key, n -> (Token, ..., Token)
+    def decode(self, key, n):
+        if n == 3:
+            prefix, last = key
+            return self.decode(prefix, 2) + (self.tokens[int(last)],)
+        key = int(key)
+        return tuple(self.tokens[(key >> (ID_BITS * (n - 1 - i))) & ID_MASK] for i in range(n))
+
+
+########################################################################################################
+############################## Keys & Counts ###########################################################
+########################################################################################################
+
+# pack_keys: [int64 array of the ids at every position of the n-grams] -> the keys of the n-grams.
+# The key of a unigram is its id, of a bigram both ids in an int64, and of a trigram a row of two int64s:
+# the key of the bigram of its first two tokens, and the id of the last one. So the keys of every n fit
+# any id of the vocabulary, and sorting the rows sorts the trigrams like their ids.
+def pack_keys(columns):
+    n = len(columns)
+    if n == 1:
+        return columns[0]
+    bigrams = (columns[0] << ID_BITS) | columns[1]
+    if n == 2:
+        return bigrams
+    if n == 3:
+        return np.stack((bigrams, columns[2]), axis=1)
+    raise ValueError("the keys are of unigrams, bigrams & trigrams, not of %d-grams" % n)
+
+
+# The keys of no n-grams.
+def empty_keys(n):
+    return pack_keys([np.zeros(0, np.int64)] * n)
+
+
+# window_keys: int64 ids with BOUNDARY between the sentences, n -> the keys of all the n-grams in the sentences.
+# The windows are a strided view of the ids, (row i is ids[i:i + n], without copying), and the keys are built
+# column by column, so there's no object per n-gram. A window with a negative id (a BOUNDARY) is dropped.
+def window_keys(ids, n):
+    windows = sliding_window_view(ids, n) if len(ids) >= n else np.zeros((0, n), np.int64)
+    columns = [windows[:, i] for i in range(n)]
+    inside = columns[0] >= 0
+    for column in columns[1:]:
+        inside &= column >= 0
+    return pack_keys(columns)[inside]
+
+
+# The ids of the tokens at position @i (from 0) of n-gram keys.
+def key_ids(keys, n, i):
+    if n == 3:
+        return key_ids(keys[:, 0], 2, i) if i < 2 else keys[:, 1]
+    return (keys >> (ID_BITS * (n - 1 - i))) & ID_MASK
+
+
+# The keys of the (n-1)-gram prefixes of n-gram keys.
+def prefix_keys(keys, n):
+    return keys[:, 0] if n == 3 else keys >> ID_BITS
+
+
+# short_keys: keys -> an int64 array in the order of the keys, or None if the ids are too large for it.
+# A trigram key is 3 ids of SHORT_ID_BITS in an int64, which NumPy sorts many times faster than the rows.
+def short_keys(keys):
+    if keys.ndim == 1:
+        return keys
+    ids = [keys[:, 0] >> ID_BITS, keys[:, 0] & ID_MASK, keys[:, 1]]
+    if len(keys) > 0 and max(column.max() for column in ids) > SHORT_ID_MASK:
+        return None
+    return (ids[0] << (2 * SHORT_ID_BITS)) | (ids[1] << SHORT_ID_BITS) | ids[2]
+
+
+# The order that sorts keys. (rows of trigram keys by their first column, then the second)
+def sort_order(keys):
+    short = short_keys(keys)
+    if short is not None:
+        return np.argsort(short, kind='stable')
+    return np.lexsort((keys[:, 1], keys[:, 0]))
+
+
+# unique_counts: keys -> (sorted distinct keys, their counts)
+def unique_counts(keys):
+    short = short_keys(keys)
+    if short is None:
+        return merge_counts([(keys, np.ones(len(keys), np.int64))])
+    short, counts = np.unique(short, return_counts=True)
+    counts = counts.astype(np.int64)
+    if keys.ndim == 1:
+        return short, counts
+    first, second, last = short >> (2 * SHORT_ID_BITS), (short >> SHORT_ID_BITS) & SHORT_ID_MASK, short & SHORT_ID_MASK
+    return pack_keys([first, second, last]), counts
+
+
+# merge_counts: [(keys, counts)] -> (sorted distinct keys, counts), summing the counts of equal keys.
+# Keys whose counts sum to 0 (when counts are subtracted) are dropped.
+def merge_counts(parts):
+    keys = np.concatenate([keys for keys, _ in parts])
+    counts = np.concatenate([counts for _, counts in parts])
+    if len(keys) == 0:
+        return keys, counts
+    order = sort_order(keys)
+    keys = keys[order]
+    counts = counts[order]
+    different = keys[1:] != keys[:-1]
+    if keys.ndim > 1:
+        different = different.any(axis=1)
+    starts = np.flatnonzero(np.concatenate(([True], different)))
+    keys, counts = keys[starts], np.add.reduceat(counts, starts)
+    nonzero = counts != 0
+    return keys[nonzero], counts[nonzero]
+
+
+# Counts keys that come in batches. The counts of the batches are merged only once they are as large
+# as what was merged so far, so every key is merged O(log #batches) times.
+class KeyCounter:
+    # n: of the n-grams of the keys.
+    def __init__(self, n):
+        self.merged = (empty_keys(n), np.zeros(0, np.int64))
+        self.pending = []
+        self.pending_size = 0
+
+    def add(self, keys):
+        self.add_counts(*unique_counts(keys))
+
+    # add_counts: distinct keys, their counts
+    def add_counts(self, keys, counts):
+        self.pending.append((keys, counts))
+        self.pending_size += len(keys)
+        if self.pending_size >= len(self.merged[0]):
+            self.merge()
+
+    def merge(self):
+        if self.pending:
+            self.merged = merge_counts([self.merged] + self.pending)
+            self.pending = []
+            self.pending_size = 0
+
+    # counts: () -> (sorted distinct keys, counts)
+    def counts(self):
+        self.merge()
+        return self.merged
+
+
+########################################################################################################
+############################## Tables ##################################################################
+########################################################################################################
+
+class NGramTables:
+    # vocabulary: Vocabulary
+    # unigrams: int64 array, the count of every token id.
+    # bigram_keys: sorted int64 array of the distinct bigrams.
+    # trigram_keys: int64 array of (#distinct trigrams, 2), its rows sorted. (see pack_keys)
+    # bigram_counts, trigram_counts: int64 arrays, the count of every key.
+    # totals: (#unigrams, #bigrams, #trigrams) occurrences in the corpus, not #distinct.
+    #   These are the sums of the counts, unless only some of the n-grams were counted. (see approximate.py)
+
+    def __init__(self, vocabulary, unigrams, bigram_keys, bigram_counts, trigram_keys, trigram_counts, totals=None):
+        self.vocabulary = vocabulary
+        self.unigrams = unigrams
+        self.bigram_keys = bigram_keys
+        self.bigram_counts = bigram_counts
+        self.trigram_keys = trigram_keys
+        self.trigram_counts = trigram_counts
+        if totals is None:
+            totals = (unigrams.sum(), bigram_counts.sum(), trigram_counts.sum())
+        self.num_unigrams, self.num_bigrams, self.num_trigrams = map(int, totals)
+        self.frequent_bitmaps = {}
+
+    def totals(self):
+        return self.num_unigrams, self.num_bigrams, self.num_trigrams
+
+    # The keys & counts of the n-grams by n, where the key of a unigram is its id.
+    def ngram_keys(self, n):
+        return [None, np.arange(len(self.unigrams), dtype=np.int64), self.bigram_keys, self.trigram_keys][n]
+
+    def ngram_counts(self, n):
+        return [None, self.unigrams, self.bigram_counts, self.trigram_counts][n]
+
+    # The counts of n-gram keys. (all of them must be in the table)
+    def counts_of(self, n, keys):
+        if n == 1:
+            return self.unigrams[keys]
+        if n == 3:
+            # the rows as single values of 2 fields, which are compared like the rows.
+            rows = np.dtype([('prefix', np.int64), ('last', np.int64)])
+            return self.trigram_counts[np.searchsorted(np.ascontiguousarray(self.trigram_keys).view(rows)[:, 0],
+                                                       np.ascontiguousarray(keys).view(rows)[:, 0])]
+        return self.bigram_counts[np.searchsorted(self.bigram_keys, keys)]
+
+    # #occurrences of the n-grams in the corpus.
+    def total(self, n):
+        return self.totals()[n - 1]
+
+    # frequent_tokens: k -> Bool array, a bitmap of the token ids that appear at least @k times in the corpus.
+    def frequent_tokens(self, k):
+        if k not in self.frequent_bitmaps:
+            self.frequent_bitmaps[k] = np.asarray(self.unigrams) >= k
+        return self.frequent_bitmaps[k]
+
+    # The n-grams whose tokens are all in the bitmap of frequent_tokens(k).
+    # frequent: n, keys, k -> Bool array
+    def frequent(self, n, keys, k):
+        bitmap = self.frequent_tokens(k)
+        mask = bitmap[key_ids(keys, n, 0)]
+        for i in range(1, n):
+            mask &= bitmap[key_ids(keys, n, i)]
+        return mask
+
+    # The n-grams that may be in the top @k scores, as a Map[(Token, ..., Token), Double].
+    # These are all the n-grams with a score at least the k-th best one, so ties are kept.
+    def top_candidates(self, n, keys, scores, k):
+        if len(scores) > k:
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+            selected = np.flatnonzero(scores >= threshold)
+            keys, scores = keys[selected], scores[selected]
+        return {self.vocabulary.decode(key, n): score for key, score in zip(keys.tolist(), scores.tolist())}
+
+
+# Counts chunks of token ids (int64 arrays, with BOUNDARY between the sentences) into NGramTables.
+# Negative ids are not counted, and neither are the n-grams they're in.
+class TablesCounter:
+    def __init__(self):
+        self.vocabulary = Vocabulary()
+        self.unigrams = np.zeros(0, np.int64)
+        self.bigrams = KeyCounter(2)
+        self.trigrams = KeyCounter(3)
+
+    def add(self, ids):
+        counts = np.bincount(ids[ids >= 0], minlength=len(self.vocabulary)).astype(np.int64)
+        counts[:len(self.unigrams)] += self.unigrams
+        self.unigrams = counts
+        self.bigrams.add(window_keys(ids, 2))
+        self.trigrams.add(window_keys(ids, 3))
+
+    def tables(self, totals=None):
+        return NGramTables(self.vocabulary, self.unigrams, *self.bigrams.counts(), *self.trigrams.counts(),
+                           totals=totals)
+
+
+# count_tables: [Sentence: String] -> NGramTables
+# A single pass over the sentences. Their token ids are gathered into chunks of about @chunk_tokens ids,
+# and every chunk is counted with NumPy, so only the current chunk and the distinct n-grams are in memory.
+def count_tables(sentences, chunk_tokens=1 << 20):
+    counter = TablesCounter()
+    encode = counter.vocabulary.encode
+    chunk = array('q')
+    for sentence in sentences:
+        chunk.extend(encode(sentence.split(' ')))
+        chunk.append(BOUNDARY)
+        if len(chunk) >= chunk_tokens:
+            counter.add(np.frombuffer(chunk, dtype=np.int64))
+            chunk = array('q')
+    counter.add(np.frombuffer(chunk, dtype=np.int64))
+    return counter.tables()
+
+
+# remap_keys: n-gram keys, n, ids: int64 array of the new id of every old id -> the keys with the new ids.
+def remap_keys(keys, n, ids):
+    return pack_keys([ids[key_ids(keys, n, i)] for i in range(n)])
+
+
+# merge_tables: [NGramTables] -> NGramTables, of all the sentences of the tables, in their order.
+# The tables may come from different processes, each with its own vocabulary, so every table's ids are mapped
+# into one vocabulary first. The tokens are added in the order of the tables, so the ids (and keys) are the
+# same as of counting all the sentences in a single count_tables.
+# A table can be subtracted by merging its negated() table. (its tokens stay in the vocabulary, with count 0)
+def merge_tables(parts):
+    vocabulary = Vocabulary()
+    unigrams = np.zeros(0, np.int64)
+    bigrams = KeyCounter(2)
+    trigrams = KeyCounter(3)
+    totals = np.zeros(3, np.int64)
+    for part in parts:
+        totals += part.totals()
+        ids = np.array(vocabulary.encode(part.vocabulary.tokens), dtype=np.int64)
+        counts = np.zeros(len(vocabulary), np.int64)
+        counts[:len(unigrams)] = unigrams
+        counts[ids] += part.unigrams
+        unigrams = counts
+        # the ids are distinct, so the remapped keys are distinct too.
+        bigrams.add_counts(remap_keys(part.bigram_keys, 2, ids), part.bigram_counts)
+        trigrams.add_counts(remap_keys(part.trigram_keys, 3, ids), part.trigram_counts)
+    tables = NGramTables(vocabulary, unigrams, *bigrams.counts(), *trigrams.counts(), totals=totals)
+    if (unigrams < 0).any() or (tables.bigram_counts < 0).any() or (tables.trigram_counts < 0).any():
+        raise ValueError("subtracted n-grams that weren't counted")
+    return tables
+
+
+# negated: NGramTables -> NGramTables, with the counts negated, to subtract them in merge_tables.
+def negated(tables):
+    return NGramTables(tables.vocabulary, -tables.unigrams, tables.bigram_keys, -tables.bigram_counts,
+                       tables.trigram_keys, -tables.trigram_counts, totals=[-total for total in tables.totals()])
+
+
+########################################################################################################
+############################## On disk #################################################################
+########################################################################################################
+
+# A folder with the tables of a corpus, so they're counted once and then just opened:
+#   meta.json                 - the format, and the sizes.
+#   vocabulary.txt            - the tokens by id, separated by '\n'. (a token never has a '\n')
+#   <array>.npy               - the count arrays, opened memory mapped.
+INDEX_FORMAT = 1
+INDEX_ARRAYS = ['unigrams', 'bigram_keys', 'bigram_counts', 'trigram_keys', 'trigram_counts']
+
+
+def is_index(folder):
+    return os.path.isfile(os.path.join(folder, 'meta.json'))
+
+
+# save_tables: NGramTables, folder -> IO ()
+# Every file is written next to its place and then moved over it, and meta.json is removed first and written last,
+# so a crash never leaves something that looks like an index. Other files in the folder are kept.
+def save_tables(tables, folder):
+    os.makedirs(folder, exist_ok=True)
+    meta = os.path.join(folder, 'meta.json')
+    if os.path.exists(meta):
+        os.remove(meta)
+
+    def replace(name, write):
+        path = os.path.join(folder, name)
+        with open(path + '.tmp', 'wb') as f:
+            write(f)
+        os.replace(path + '.tmp', path)
+
+    replace('vocabulary.txt', lambda f: f.write('\n'.join(tables.vocabulary.tokens).encode('utf-8')))
+    for name in INDEX_ARRAYS:
+        replace(name + '.npy', lambda f: np.save(f, np.ascontiguousarray(getattr(tables, name), np.int64)))
+    replace('meta.json', lambda f: f.write(json.dumps(
+        {'format': INDEX_FORMAT, 'id_bits': ID_BITS, 'vocabulary': len(tables.vocabulary),
+         'bigrams': len(tables.bigram_keys), 'trigrams': len(tables.trigram_keys),
+         'totals': tables.totals()}).encode('utf-8')))
+
+
+# load_tables: folder -> NGramTables, with the count arrays memory mapped (read only) from the files.
+def load_tables(folder):
+    with open(os.path.join(folder, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta.get('format') != INDEX_FORMAT or meta.get('id_bits') != ID_BITS:
+        raise ValueError("%s is an index of another format: %s" % (folder, meta))
+    with open(os.path.join(folder, 'vocabulary.txt'), encoding='utf-8', newline='') as f:
+        tokens = f.read().split('\n') if meta['vocabulary'] > 0 else []
+    arrays = [np.load(os.path.join(folder, name + '.npy'), mmap_mode='r') for name in INDEX_ARRAYS]
+    return NGramTables(Vocabulary(tokens), *arrays, totals=meta.get('totals'))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import random
+from collections import Counter
+from unittest import TestCase
+
+import numpy as np
+
+from approximate import *
+
+
+def zipf_sentences(count, seed):
+    generator = random.Random(seed)
+    tokens = ['t%d' % i for i in range(3000)]
+    weights = [1 / (i + 1) for i in range(len(tokens))]
+    return [' '.join(generator.choices(tokens, weights, k=generator.randint(1, 12))) for _ in range(count)]
+
+
+def counts_by_ngram(tables, n):
+    keys, counts = [None, None, (tables.bigram_keys, tables.bigram_counts),
+                    (tables.trigram_keys, tables.trigram_counts)][n]
+    return {tables.vocabulary.decode(key, n): count for key, count in zip(keys.tolist(), counts.tolist())}
+
+
+class TestApproximate(TestCase):
+    def test_heavyBigramOfLargeHashes(self):
+        # crc32('a2') is above 2^31, which made its heavy bigram's key negative.
+        self.assertGreaterEqual(zlib.crc32(b'a2'), 1 << 31)
+        sentences = ['a2 a3'] * 60 + ['x%d y%d' % (i, i) for i in range(2000)]
+        tables = approximate_tables(lambda: iter(sentences), 1000, heavy_hitters=100)
+        self.assertEqual(counts_by_ngram(tables, 2), {('a2', 'a3'): 60})
+        self.assertLess(uncounted_bigram_bound(tables, 1000, 100), 60)
+
+    def test_againstExact(self):
+        sentences = zipf_sentences(5000, 1)
+        min_occurrences = 50
+        heavy_hitters = 200
+        exact = count_tables(sentences)
+        tables = approximate_tables(lambda: iter(sentences), min_occurrences, heavy_hitters=heavy_hitters)
+        self.assertEqual(tables.totals(), exact.totals())
+        bound = uncounted_bigram_bound(tables, min_occurrences, heavy_hitters)
+        exact_unigrams = dict(zip(exact.vocabulary.tokens, exact.unigrams.tolist()))
+        for n in (2, 3):
+            counted = counts_by_ngram(tables, n)
+            for ngram, count in counts_by_ngram(exact, n).items():
+                if all(exact_unigrams[token] >= min_occurrences for token in ngram):
+                    # the n-grams of the PMIs are all counted, exactly.
+                    self.assertEqual(counted.get(ngram), count, ngram)
+                elif ngram in counted:
+                    self.assertEqual(counted[ngram], count, ngram)
+                elif n == 2:
+                    self.assertLessEqual(count, bound, ngram)
+
+    def test_misraGries(self):
+        generator = np.random.default_rng(2)
+        batches = [generator.zipf(1.5, 3000).astype(np.int64) for _ in range(10)]
+        summary = MisraGries(50)
+        for batch in batches:
+            summary.add(batch)
+        exact = Counter(np.concatenate(batches).tolist())
+        total = sum(exact.values())
+        estimates = dict(zip(summary.keys.tolist(), summary.counts.tolist()))
+        for key, count in exact.items():
+            if count > total / 51:
+                self.assertIn(key, estimates)
+            self.assertLessEqual(estimates.get(key, 0), count)
+            self.assertGreaterEqual(estimates.get(key, 0), count - total / 51)
+
+    def test_countMinSketch(self):
+        tokens = ' '.join(zipf_sentences(2000, 3)).split(' ')
+        h1, h2 = (np.array(h, np.int64) for h in token_hashes(tokens))
+        sketch = CountMinSketch(0.01, 0.01)
+        sketch.add(h1, h2)
+        exact = Counter(tokens)
+        estimates = sketch.estimate(h1, h2)
+        for token, estimate in zip(tokens, estimates.tolist()):
+            self.assertGreaterEqual(estimate, exact[token])
+            self.assertLessEqual(estimate, exact[token] + 0.01 * len(tokens) * 3)
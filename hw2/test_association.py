@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import os
+import warnings
+from unittest import TestCase, skipIf
+
+import numpy as np
+
+from association import *
+
+try:
+    from scipy.stats import chi2_contingency
+except ImportError:
+    chi2_contingency = None
+
+# hw2.py is loaded from its file, as running the tests from the repository root makes 'hw2' the folder.
+spec = importlib.util.spec_from_file_location('hw2_script', os.path.join(os.path.dirname(__file__), 'hw2.py'))
+hw2 = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(hw2)
+
+
+def keys_of(tables, ngrams):
+    n = len(ngrams[0])
+    ids = np.array([tables.vocabulary.encode(ngram) for ngram in ngrams], np.int64)
+    return pack_keys([ids[:, i] for i in range(n)])
+
+
+def cells(table):
+    return list(zip(*(cell.tolist() for cell in table)))
+
+
+class TestAssociation(TestCase):
+    def test_contingency(self):
+        # a: 3, b: 3; the bigrams a b: 2, b a: 2; the trigrams a b a: 1, b a b: 1.
+        tables = count_tables(['a b a b', 'b a'])
+        self.assertEqual(cells(contingency(tables, 2, keys_of(tables, [('a', 'b'), ('b', 'a')]))),
+                         [(2, 1, 1, 0), (2, 1, 1, 0)])
+        # o22 would be 2 - 1 - 1 - 2, as the last token's count is of the whole corpus.
+        self.assertEqual(cells(contingency(tables, 3, keys_of(tables, [('a', 'b', 'a'), ('b', 'a', 'b')]))),
+                         [(1, 1, 2, 0), (1, 1, 2, 0)])
+
+    @skipIf(chi2_contingency is None, 'needs scipy')
+    def test_likeScipy(self):
+        generator = np.random.default_rng(2)
+        observed = generator.integers(1, 50, (200, 4)).astype(np.float64)
+        observed[::7, 3] = 0
+        table = Contingency(*observed.T)
+        for cells, chi2, llr in zip(observed, chi_square(table), log_likelihood(table)):
+            self.assertAlmostEqual(chi2, chi2_contingency(cells.reshape(2, 2), correction=False)[0])
+            self.assertAlmostEqual(llr, chi2_contingency(cells.reshape(2, 2), correction=False,
+                                                         lambda_='log-likelihood')[0])
+
+    def test_pmiLikeHw2(self):
+        sentences = [' '.join(str(i * j % 11) for j in range(1, 30)) for i in range(1, 40)]
+        tables = count_tables(sentences)
+        keys, scores = hw2.bigram_pmi_filtered(tables, 1)
+        table = contingency(tables, 2, keys)
+        # hw2 divides the bigram counts by #bigrams and the token counts by #tokens, and the measures
+        # all the counts by the total of the table.
+        shift = np.log2(table.total * tables.total(2) / tables.total(1) ** 2)
+        np.testing.assert_allclose(pmi(table), scores + shift)
+
+    def test_chiSquareOfNoMargin(self):
+        # the only bigram is in every bigram, so o12 + o22 = o21 + o22 = 0.
+        tables = count_tables(['a b'])
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            scores = score_ngrams(tables, 2, sorted(measures))
+        self.assertEqual(scores['chi_square'][1].tolist(), [0])
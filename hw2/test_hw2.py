@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import os
+import random
+import re
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+# hw2.py is loaded from its file, as running the tests from the repository root makes 'hw2' the folder.
+spec = importlib.util.spec_from_file_location('hw2_script', os.path.join(os.path.dirname(__file__), 'hw2.py'))
+hw2 = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(hw2)
+file_sentences = hw2.file_sentences
+
+
+# The sentences of a text as hw2 first split them, with the whole text in memory.
+def split_sentences(text):
+    return re.sub(" +", " ", re.sub(r"(\r\n)+|\n+|\xa0|\t", "\n", text)).split("\n")
+
+
+def random_texts(count, seed):
+    generator = random.Random(seed)
+    for _ in range(count):
+        yield ''.join(generator.choice('ab  \r\n\n\t\xa0א') for _ in range(generator.randint(0, 30)))
+
+
+class TestFileSentences(TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.temp.name, 'text.txt')
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def sentences(self, text):
+        with open(self.file, 'wb') as f:
+            f.write(text.encode('utf-8'))
+        return list(file_sentences(self.file))
+
+    def test_edges(self):
+        for text in ['', '\n', '\r\n', 'a\r\n\r\nb', 'a\n\n\nb', 'a\n\r\nb', 'a\r\n\nb', 'a\r\rb\r', 'a\r\n\r',
+                     'a\t\tb', 'a\xa0\nb', 'a  b   \n  c', ' \n ', 'א ב\r\n', 'a\n\n']:
+            self.assertEqual(self.sentences(text), split_sentences(text), repr(text))
+
+    def test_random(self):
+        for text in random_texts(3000, 1):
+            self.assertEqual(self.sentences(text), split_sentences(text), repr(text))
+
+
+# The counts of the tables by the n-grams themselves, without the ids (which depend on the order of counting).
+def counts_by_ngram(tables):
+    counts = {(token,): count for token, count in zip(tables.vocabulary.tokens, tables.unigrams.tolist()) if count != 0}
+    for n, keys, values in [(2, tables.bigram_keys, tables.bigram_counts),
+                            (3, tables.trigram_keys, tables.trigram_counts)]:
+        for key, count in zip(keys.tolist(), values.tolist()):
+            if count != 0:
+                counts[tables.vocabulary.decode(key, n)] = count
+    return counts
+
+
+def totals(tables):
+    return tables.num_unigrams, tables.num_bigrams, tables.num_trigrams
+
+
+class TestUpdateIndex(TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.temp.name, 'input')
+        self.index = os.path.join(self.temp.name, 'index')
+        os.makedirs(self.input)
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def write(self, file, text):
+        with open(os.path.join(self.input, file), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def assertUpdated(self):
+        tables = hw2.update_index(self.input, self.index)
+        fresh = hw2.count_tables(hw2.all_texts(self.input))
+        self.assertEqual(counts_by_ngram(tables), counts_by_ngram(fresh))
+        self.assertEqual(totals(tables), totals(fresh))
+        # and the index on disk is the same as the returned tables.
+        self.assertEqual(counts_by_ngram(hw2.load_tables(self.index)), counts_by_ngram(fresh))
+        manifest = hw2.read_manifest(self.index)
+        self.assertEqual(manifest, {file: hw2.file_hash(os.path.join(self.input, file))
+                                    for file in os.listdir(self.input)})
+        self.assertEqual(sorted(os.listdir(os.path.join(self.index, 'files'))), sorted(set(manifest.values())))
+
+    def test_addChangeRemove(self):
+        self.write('a.txt', 'a b c a b\nb c')
+        self.write('b.txt', 'c a b c\r\nd')
+        self.assertUpdated()
+        self.write('c.txt', 'a b c\nd e')
+        self.assertUpdated()
+        self.write('a.txt', 'b c\nx y z')
+        self.assertUpdated()
+        os.remove(os.path.join(self.input, 'b.txt'))
+        self.assertUpdated()
+        # the same content in two files is kept once in files/, but counted twice.
+        self.write('d.txt', 'a b c\nd e')
+        self.assertUpdated()
+        os.remove(os.path.join(self.input, 'c.txt'))
+        self.assertUpdated()
+        self.assertUpdated()
+
+    def test_emptyInput(self):
+        self.assertUpdated()
+        self.assertEqual(totals(hw2.load_tables(self.index)), (0, 0, 0))
+        self.write('a.txt', 'a b c')
+        self.assertUpdated()
+        os.remove(os.path.join(self.input, 'a.txt'))
+        self.assertUpdated()
+
+    def test_interruptedUpdate(self):
+        self.write('a.txt', 'a b c a b\nb c')
+        self.assertUpdated()
+        self.write('b.txt', 'c a b c')
+        # stopped after the new totals were saved, before their manifest.
+        with patch.object(hw2, 'write_manifest', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                hw2.update_index(self.input, self.index)
+        self.assertUpdated()
+        self.assertUpdated()
+
+    def test_subtractUncounted(self):
+        counted = hw2.count_tables(['a b c'])
+        with self.assertRaises(ValueError):
+            hw2.merge_tables([counted, hw2.negated(hw2.count_tables(['a b d']))])
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import time
+import tracemalloc
+from unittest import TestCase
+
+import instrumentation
+from instrumentation import *
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        self.state = instrumentation.target, instrumentation.memory, list(records)
+        self.tracing = tracemalloc.is_tracing()
+        instrumentation.target, instrumentation.memory = None, False
+        records.clear()
+
+    def tearDown(self):
+        instrumentation.target, instrumentation.memory, saved = self.state
+        records[:] = saved
+        running.clear()
+        if not self.tracing:
+            tracemalloc.stop()
+
+    def test_disabled(self):
+        items = [1, 2, 3]
+        self.assertIs(stage('count'), no_stage)
+        self.assertIs(traced('read', items), items)
+        with stage('count') as counting:
+            counting.items = 5
+        self.assertEqual(records, [])
+
+    def test_parseSpec(self):
+        self.assertEqual(parse_spec('table'), ('table', False))
+        self.assertEqual(parse_spec('1'), ('1', False))
+        self.assertEqual(parse_spec('out/trace.json,memory'), ('out/trace.json', True))
+        self.assertEqual(parse_spec('memory'), ('table', True))
+        for spec in ['0', 'trace', 'table,peaks', 'a.json,memory,x']:
+            with self.assertRaises(ValueError):
+                parse_spec(spec)
+
+    def test_nestedPeaks(self):
+        enable('table,memory', report_at_exit=False)
+        with stage('outer') as outer:
+            with stage('inner') as inner:
+                block = bytearray(8 << 20)
+                del block
+        self.assertGreaterEqual(inner.peak, 8 << 20)
+        # tracemalloc's peak was reset for the inner stage, and the outer one still has it.
+        self.assertGreaterEqual(outer.peak, inner.peak)
+        self.assertEqual([(record['stage'], record['inside']) for record in records],
+                         [('inner', ['outer']), ('outer', [])])
+
+    def test_tracedCountsOnlyTheProducer(self):
+        enable('table', report_at_exit=False)
+
+        def produce():
+            for i in range(3):
+                time.sleep(0.05)
+                yield i
+
+        consumed = []
+        for item in traced('read', produce()):
+            time.sleep(0.1)
+            consumed.append(item)
+        self.assertEqual(consumed, [0, 1, 2])
+        [record] = records
+        self.assertEqual(record['items'], 3)
+        self.assertGreaterEqual(record['wall'], 0.15)
+        self.assertLess(record['wall'], 0.3)
+
+    def test_summary(self):
+        finished = [{'stage': 'read', 'wall': 1.0, 'cpu': 0.5, 'items': 10, 'peak': None},
+                    {'stage': 'count', 'wall': 2.0, 'cpu': 2.0, 'items': 3, 'peak': 100},
+                    {'stage': 'read', 'wall': 0.5, 'cpu': 0.25, 'items': 5, 'peak': None},
+                    {'stage': 'count', 'wall': 1.0, 'cpu': 1.0, 'items': 1, 'peak': 300}]
+        self.assertEqual(summary(finished),
+                         [{'stage': 'read', 'calls': 2, 'wall': 1.5, 'cpu': 0.75, 'items': 15, 'peak': None},
+                          {'stage': 'count', 'calls': 2, 'wall': 3.0, 'cpu': 3.0, 'items': 4, 'peak': 300}])
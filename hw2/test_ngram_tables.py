@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from collections import Counter
+from unittest import TestCase
+
+import numpy as np
+
+from ngram_tables import *
+
+sentences = ['a b c a b', 'b c', 'a', 'c a b c a b c']
+
+
+def ngrams(sentences, n):
+    return Counter(tuple(tokens[i:i + n]) for tokens in (s.split(' ') for s in sentences)
+                   for i in range(len(tokens) - n + 1))
+
+
+def decoded(tables, n):
+    keys, counts = [None, None, (tables.bigram_keys, tables.bigram_counts),
+                    (tables.trigram_keys, tables.trigram_counts)][n]
+    return {tables.vocabulary.decode(key, n): count for key, count in zip(keys.tolist(), counts.tolist())}
+
+
+class TestNGramTables(TestCase):
+    def test_counts(self):
+        tables = count_tables(sentences, chunk_tokens=4)
+        self.assertEqual(decoded(tables, 2), ngrams(sentences, 2))
+        self.assertEqual(decoded(tables, 3), ngrams(sentences, 3))
+        self.assertEqual((tables.num_unigrams, tables.num_bigrams, tables.num_trigrams), (15, 11, 8))
+
+    def test_largeIds(self):
+        # ids past SHORT_ID_BITS are sorted as rows, and ids of all 31 bits still fit in the keys.
+        ids = np.array([MAX_VOCABULARY - 1, 5, SHORT_ID_MASK + 1, BOUNDARY, 5, SHORT_ID_MASK + 1, 7,
+                        MAX_VOCABULARY - 1, 5, SHORT_ID_MASK + 1, 7], np.int64)
+        keys, counts = unique_counts(window_keys(ids, 3))
+        found = dict(zip(zip(*(key_ids(keys, 3, i).tolist() for i in range(3))), counts.tolist()))
+        self.assertEqual(found, {(MAX_VOCABULARY - 1, 5, SHORT_ID_MASK + 1): 2, (5, SHORT_ID_MASK + 1, 7): 2,
+                                 (SHORT_ID_MASK + 1, 7, MAX_VOCABULARY - 1): 1, (7, MAX_VOCABULARY - 1, 5): 1})
+        self.assertEqual(keys.tolist(), sorted(keys.tolist()))
+        self.assertEqual(merge_counts([(keys, counts), (keys[:1], -counts[:1])])[0].tolist(), keys[1:].tolist())
+
+    def test_sortedLikeShortKeys(self):
+        generator = np.random.default_rng(1)
+        keys = pack_keys([generator.integers(0, 50, 1000) for _ in range(3)])
+        short = unique_counts(keys)
+        rows = merge_counts([(keys, np.ones(len(keys), np.int64))])
+        self.assertEqual(short[0].tolist(), rows[0].tolist())
+        self.assertEqual(short[1].tolist(), rows[1].tolist())
+
+    def test_countsOf(self):
+        tables = count_tables(sentences)
+        keys = tables.trigram_keys[::-1]
+        self.assertEqual(tables.counts_of(3, keys).tolist(), tables.trigram_counts[::-1].tolist())
+        self.assertEqual(tables.counts_of(2, prefix_keys(keys, 3)).tolist(),
+                         [ngrams(sentences, 2)[trigram[:2]] for trigram in
+                          (tables.vocabulary.decode(key, 3) for key in keys.tolist())])
+
+    def test_mergeTables(self):
+        parts = [count_tables(sentences[:2]), count_tables(sentences[2:])]
+        merged = merge_tables(parts)
+        whole = count_tables(sentences)
+        self.assertEqual(merged.vocabulary.tokens, whole.vocabulary.tokens)
+        for name in ['unigrams', 'bigram_keys', 'bigram_counts', 'trigram_keys', 'trigram_counts']:
+            self.assertEqual(getattr(merged, name).tolist(), getattr(whole, name).tolist())
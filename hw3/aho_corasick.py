@@ -0,0 +1,54 @@
+# Finds which of many patterns occur in a text in a single pass over it, with an Aho-Corasick automaton.
+# The automaton is a trie of the patterns, where every state also moves on the characters it has no child for,
+# to the state of the longest suffix of its string that's a prefix of a pattern. So scanning a character is
+# a single dict lookup, and the time of a scan doesn't depend on the number of patterns.
+
+
+class AhoCorasick:
+    # patterns: [String]. The matches are reported as indices in this list, so a pattern that appears
+    # twice is reported twice.
+    def __init__(self, patterns):
+        self.patterns = patterns
+        # The children of the states of the trie: state -> Map[Char, state]. The root is state 0.
+        children = [{}]
+        # The patterns that end at the state.
+        ends = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                if char not in children[state]:
+                    children[state][char] = len(children)
+                    children.append({})
+                    ends.append([])
+                state = children[state][char]
+            ends[state].append(index)
+
+        # By breadth first order, so the state of a suffix is complete before the states that fall back to it.
+        # moves: state -> Map[Char, next state], without the moves back to the root.
+        # matches: state -> the indices of the patterns that are suffixes of the state's string.
+        self.moves = [None] * len(children)
+        self.matches = [None] * len(children)
+        self.moves[0] = dict(children[0])
+        self.matches[0] = tuple(ends[0])
+        queue = [(child, 0) for child in children[0].values()]
+        for state, suffix in queue:
+            moves = dict(self.moves[suffix])
+            moves.update(children[state])
+            self.moves[state] = moves
+            self.matches[state] = tuple(ends[state]) + self.matches[suffix]
+            for char, child in children[state].items():
+                queue.append((child, self.moves[suffix].get(char, 0)))
+
+    # found: text -> [index of a pattern that occurs in the text], ascending.
+    def found(self, text):
+        moves = self.moves
+        state = 0
+        visited = {0}
+        for char in text:
+            state = moves[state].get(char, 0)
+            visited.add(state)
+        matches = self.matches
+        found = set()
+        for state in visited:
+            found.update(matches[state])
+        return sorted(found)
@@ -0,0 +1,6 @@
+# The hw3 modules import each other by name, as they are run as scripts from this folder,
+# so the tests need the folder on the path too.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
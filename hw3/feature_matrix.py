@@ -0,0 +1,96 @@
+# The binary review x feature matrix of hw3, computed once and cached on disk.
+# Needs scipy, for the sparse matrix and its .npz files. (see requirements.txt)
+
+import os
+import re
+import hashlib
+
+import numpy as np
+from scipy import sparse
+
+from aho_corasick import *
+
+# Where the matrices are kept between the runs.
+cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feature_cache')
+
+# Changing how the matrix is computed must change the keys of the cached matrices.
+MATRIX_FORMAT = 1
+
+
+######################################################################
+################### Matching the features ############################
+######################################################################
+
+def to_words(text):
+    text = re.sub(r"\r\n|\n|\t", " ", text)
+    text = re.sub(r" +", " ", text)
+    return text.split(" ")
+
+
+def contains(words, keyword):
+    for word in words:
+        if keyword in word:
+            return 1
+    return 0
+
+
+# The feature vector of a single text, feature by feature. The rows of the matrix are the same, just faster.
+def calc_feature_vector(feature_model, text):
+    words = to_words(text)
+    # We set 1 for a feature word if it's contained in a word in the text.
+    # Our features are roots of words.
+    return list(map(lambda keyword: contains(words, keyword), feature_model))
+
+
+# A feature is contained in a word of the text iff it occurs in the distinct words joined by '\n',
+# as no feature or word has a '\n' in it. So all the features are found in a single scan of the text.
+# matched_features: AhoCorasick of the features, text -> [index of a feature contained in a word of the text]
+def matched_features(automaton, text):
+    return automaton.found("\n".join(set(to_words(text))))
+
+
+######################################################################
+################### The review x feature matrix ######################
+######################################################################
+
+# dataset_hash: [text], [feature] -> hex String
+def dataset_hash(texts, features):
+    h = hashlib.sha256(b'%d' % MATRIX_FORMAT)
+    for part in [features, texts]:
+        h.update(b'%d\0' % len(part))
+        for s in part:
+            encoded = s.encode('utf-8')
+            h.update(b'%d\0' % len(encoded))
+            h.update(encoded)
+    return h.hexdigest()
+
+
+# calc_feature_matrix: [text], [feature] -> CSR matrix of (#texts x #features), of 0/1
+def calc_feature_matrix(texts, features):
+    automaton = AhoCorasick(features)
+    indptr = [0]
+    indices = []
+    for text in texts:
+        indices.extend(matched_features(automaton, text))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), np.int8)
+    return sparse.csr_matrix((data, np.array(indices, np.int32), np.array(indptr, np.int32)),
+                             shape=(len(texts), len(features)))
+
+
+# feature_matrix: [text], [feature], cache folder -> IO CSR matrix of (#texts x #features), of 0/1
+# The matrix of the reviews' binary feature vectors: 1 at (i, j) if feature j is contained in a word of text i,
+# like calc_feature_vector. It's computed once per dataset & feature list, and loaded from @cache on later runs.
+def feature_matrix(texts, features, cache=cache_dir):
+    if cache is None:
+        return calc_feature_matrix(texts, features)
+    path = os.path.join(cache, dataset_hash(texts, features) + '.npz')
+    if os.path.exists(path):
+        return sparse.load_npz(path).tocsr()
+    matrix = calc_feature_matrix(texts, features)
+    os.makedirs(cache, exist_ok=True)
+    # written aside and renamed, so a run that's stopped in the middle doesn't leave a broken matrix.
+    temp_path = path[:-len('.npz')] + '.tmp.npz'
+    sparse.save_npz(temp_path, matrix)
+    os.replace(temp_path, path)
+    return matrix
@@ -15,6 +15,8 @@ from sklearn import neighbors
 from sklearn import cross_validation
 import numpy as np
 
+from feature_matrix import *
+
 
 ######################################################################
 ################### Reading the dataset ##############################
@@ -63,24 +65,6 @@ def read_features(file):
     return to_words(read_file(file))
 
 
-######################################################################
-################### Feature Vectors for Step 1 #######################
-######################################################################
-
-def contains(words, keyword):
-    for word in words:
-        if keyword in word:
-            return 1
-    return 0
-
-
-def calc_feature_vector(feature_model, text):
-    words = to_words(text)
-    # We set 1 for a feature word if it's contained in a word in the text.
-    # Our features are roots of words.
-    return list(map(lambda keyword: contains(words, keyword), feature_model))
-
-
 ######################################################################
 ##################### Read The Data ##################################
 ######################################################################
@@ -118,10 +102,8 @@ def evaluate(data, target):
 
 
 def evaluateFeatures(features):
-    positive_feature_vectors = list(map(lambda text: calc_feature_vector(features, text), positives))
-    negative_feature_vectors = list(map(lambda text: calc_feature_vector(features, text), negatives))
-
-    data = positive_feature_vectors + negative_feature_vectors
+    # The rows of the positives, then of the negatives, like the target.
+    data = feature_matrix(texts, features)
 
     evaluate(data, target)
 
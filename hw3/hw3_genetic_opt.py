@@ -9,6 +9,8 @@ from sklearn import tree
 from sklearn import neighbors
 import numpy as np
 
+from feature_matrix import *
+
 
 ######################################################################
 ################### Reading the dataset ##############################
@@ -59,24 +61,10 @@ def read_features():
 ################### Feature Vectors ##################################
 ######################################################################
 
-def contains(words, keyword):
-    for word in words:
-        if keyword in word:
-            return 1
-    return 0
-
-
 def get_feature_model(positives, negatives):
     return read_features()
 
 
-def calc_feature_vector(feature_model, text):
-    words = to_words(text)
-    # We set 1 for a feature word if it's contained in a word in the text.
-    # Our features are roots of words.
-    return list(map(lambda keyword: contains(words, keyword), feature_model))
-
-
 def prettify_feature_vector(feature_vector, features):
     return zip(features, feature_vector)
 
@@ -106,10 +94,9 @@ def features_subset(feature_vector, bitset):
 
 
 def calc_accuracy(bitset):
-    positive_vectors = list(map(lambda vector: features_subset(vector, bitset), positive_feature_vectors))
-    negative_vectors = list(map(lambda vector: features_subset(vector, bitset), negative_feature_vectors))
-    data = positive_vectors + negative_vectors
-    scores = cross_validation.cross_val_score(clf, data, target, cv=4)
+    # The columns of the features in the subset.
+    subset_data = data[:, features_subset(range(len(features)), bitset)]
+    scores = cross_validation.cross_val_score(clf, subset_data, target, cv=4)
     return scores.mean()
 
 root_dir = "C:\\Users\\Ilan\\Programming\\University\\NLP-HW\\hw3\\"
@@ -120,11 +107,11 @@ def get_features():
     negatives = read_negative_reviews(input_dir)
     features = get_feature_model(positives, negatives)
 
-    positive_feature_vectors = list(map(lambda text: calc_feature_vector(features, text), positives))
-    negative_feature_vectors = list(map(lambda text: calc_feature_vector(features, text), negatives))
-
-    data = positive_feature_vectors + negative_feature_vectors
-    target = np.array(([1] * 1000) + ([0] * 1000))
+    # Computed once for the dataset & features, and loaded from the cache on the next runs.
+    data = feature_matrix(positives + negatives, features)
+    positive_feature_vectors = data[:len(positives)]
+    negative_feature_vectors = data[len(positives):]
+    target = np.array(([1] * len(positives)) + ([0] * len(negatives)))
     return data, target, positive_feature_vectors, negative_feature_vectors, features
 
 if __name__ == '__main__':
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import random
+from unittest import TestCase
+
+from aho_corasick import *
+from feature_matrix import contains, matched_features, to_words
+
+
+def random_strings(generator, count, length):
+    return [''.join(generator.choice('abc\r') for _ in range(generator.randint(0, length))) for _ in range(count)]
+
+
+# The indices of the patterns contained in a word of the words, one pattern at a time.
+def contained(patterns, words):
+    return [i for i, pattern in enumerate(patterns) if contains(words, pattern)]
+
+
+class TestAhoCorasick(TestCase):
+    def test_found(self):
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+        self.assertEqual(automaton.found('ushers'), [0, 1, 3])
+        self.assertEqual(automaton.found('his'), [2])
+        self.assertEqual(automaton.found('xyz'), [])
+
+    def test_emptyAndDuplicatePatterns(self):
+        automaton = AhoCorasick(['', 'ab', 'b', 'ab', ''])
+        self.assertEqual(automaton.found(''), [0, 4])
+        self.assertEqual(automaton.found('xab'), [0, 1, 2, 3, 4])
+        self.assertEqual(AhoCorasick([]).found('abc'), [])
+
+    def test_likeContains(self):
+        generator = random.Random(1)
+        for _ in range(300):
+            patterns = random_strings(generator, generator.randint(0, 12), 4)
+            words = random_strings(generator, generator.randint(1, 8), 8)
+            # the words of a text never have a ' ', '\n' or '\t'.
+            text = ' '.join(words)
+            self.assertEqual(matched_features(AhoCorasick(patterns), text), contained(patterns, to_words(text)),
+                             (patterns, words))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import codecs
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import feature_matrix as engine
+from feature_matrix import *
+
+folder = os.path.dirname(os.path.abspath(__file__))
+
+
+def read_file(file_path):
+    with codecs.open(file_path, 'r', 'utf-8') as f:
+        return f.read()
+
+
+def some_reviews(count):
+    reviews = []
+    for label in ['pos', 'neg']:
+        reviews_dir = os.path.join(folder, 'imdb1.train', label)
+        reviews += [read_file(os.path.join(reviews_dir, file)) for file in sorted(os.listdir(reviews_dir))[:count]]
+    return reviews
+
+
+class TestFeatureMatrix(TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.texts = some_reviews(25)
+        self.features = to_words(read_file(os.path.join(folder, 'all_root_features.txt')))
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def test_rowsAreFeatureVectors(self):
+        matrix = feature_matrix(self.texts, self.features, cache=None)
+        self.assertEqual(matrix.shape, (len(self.texts), len(self.features)))
+        for i, text in enumerate(self.texts):
+            self.assertEqual(matrix[i].toarray()[0].tolist(), calc_feature_vector(self.features, text))
+
+    def test_cached(self):
+        computed = feature_matrix(self.texts, self.features, cache=self.temp.name)
+        self.assertEqual(os.listdir(self.temp.name), [dataset_hash(self.texts, self.features) + '.npz'])
+        with patch.object(engine, 'calc_feature_matrix', side_effect=AssertionError('not from the cache')):
+            loaded = feature_matrix(self.texts, self.features, cache=self.temp.name)
+        self.assertEqual(loaded.format, 'csr')
+        self.assertEqual((loaded != computed).nnz, 0)
+
+    def test_keyedByDatasetAndFeatures(self):
+        key = dataset_hash(self.texts, self.features)
+        self.assertNotEqual(dataset_hash(self.texts[1:], self.features), key)
+        self.assertNotEqual(dataset_hash(self.texts, self.features[1:]), key)
+        # the texts & features aren't just concatenated.
+        self.assertNotEqual(dataset_hash(['ab', 'c'], ['x']), dataset_hash(['a', 'bc'], ['x']))
+        feature_matrix(self.texts, self.features, cache=self.temp.name)
+        feature_matrix(self.texts, self.features[1:], cache=self.temp.name)
+        self.assertEqual(len(os.listdir(self.temp.name)), 2)